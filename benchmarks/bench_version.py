@@ -0,0 +1,41 @@
+"""
+Times the game version sniffing on a data file the size of a real one.
+
+Run with `python benchmarks/bench_version.py`.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Import the package from this checkout, the benchmarks aren't installed.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from vollerei.game.version import sniff_version
+
+ROUNDS = 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_file = Path(temp_dir, "data.unity3d")
+        with data_file.open("wb") as f:
+            f.write(b"\xff" * 0x7D0 + b"\x003.10.12&")
+            # The version is near the start of a file of a few hundred MB.
+            f.truncate(256 * 1024 * 1024)
+        start = time.perf_counter()
+        for i in range(ROUNDS):
+            # A different modification time each round, so nothing is cached.
+            os.utime(data_file, ns=(i, i))
+            assert sniff_version(data_file, 0x7D0, b"&") == (3, 10, 12)
+        uncached = (time.perf_counter() - start) / ROUNDS
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            sniff_version(data_file, 0x7D0, b"&")
+        cached = (time.perf_counter() - start) / ROUNDS
+    print(f"uncached: {uncached * 1e6:.1f} us, cached: {cached * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
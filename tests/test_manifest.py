@@ -0,0 +1,73 @@
+import hashlib
+import json
+import sys
+import tracemalloc
+
+from vollerei.common.manifest import Manifest
+
+
+def make_lines(count: int, prefix: str = "StarRail_Data/Asb") -> list[str]:
+    return [
+        json.dumps(
+            {
+                "remoteName": f"{prefix}/{i:08x}.block",
+                "md5": hashlib.md5(str(i).encode()).hexdigest(),
+                "fileSize": i * 1000,
+            }
+        )
+        for i in range(count)
+    ]
+
+
+def test_parse():
+    manifest = Manifest.from_lines(make_lines(3) + [""], origin="pkg_version")
+    assert len(manifest) == 3
+    path = "StarRail_Data/Asb/00000002.block"
+    assert path in manifest
+    assert manifest.md5(path) == hashlib.md5(b"2").hexdigest()
+    assert manifest.size(path) == 2000
+    assert manifest.origin(path) == "pkg_version"
+    assert manifest.get("missing") is None
+    assert manifest.total_size() == 3000
+
+
+def test_merge():
+    base = Manifest.from_lines(make_lines(2), origin="pkg_version")
+    audio = Manifest.from_lines(
+        make_lines(3, "StarRail_Data/Audio"), origin="Audio_English_pkg_version"
+    )
+    # Later manifests take precedence for duplicated files.
+    audio.add(
+        "StarRail_Data/Asb/00000000.block", "00" * 16, 1, "Audio_English_pkg_version"
+    )
+    merged = Manifest.merge(base, audio)
+    assert len(merged) == 5
+    assert merged.origins == ["pkg_version", "Audio_English_pkg_version"]
+    assert merged["StarRail_Data/Asb/00000000.block"].size == 1
+    assert len(list(merged.entries(origin="Audio_English_pkg_version"))) == 4
+    assert list(merged.entries(origin="Audio_Japanese_pkg_version")) == []
+
+
+def test_memory_footprint():
+    count = 20000
+    lines = make_lines(count)
+    tracemalloc.start()
+    try:
+        manifest = Manifest.from_lines(lines)
+        manifest_size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    tracemalloc.start()
+    try:
+        # What a dict for every file takes.
+        files = {}
+        for line in lines:
+            file = json.loads(line)
+            files[file["remoteName"]] = file
+        dict_size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    paths_size = sum(sys.getsizeof(x) for x in manifest)
+    # The checksum, size, origin and index of a file, besides its path.
+    assert (manifest_size - paths_size) / count < 200
+    assert manifest_size < dict_size / 2
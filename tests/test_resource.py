@@ -0,0 +1,96 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from vollerei.common.api import resource
+from vollerei.common.enums import VoicePackLanguage
+
+
+def make_major(version: str) -> dict:
+    return {
+        "version": version,
+        "game_pkgs": [
+            {
+                "url": f"https://example.com/game_{version}.zip",
+                "md5": "0" * 32,
+                "size": "123",
+                "decompressed_size": "456",
+            }
+        ],
+        "audio_pkgs": [
+            {
+                "language": "en-us",
+                "url": f"https://example.com/audio_{version}.zip",
+                "md5": "0" * 32,
+                "size": "1",
+                "decompressed_size": "2",
+            }
+        ],
+        "res_list_url": "https://example.com/res",
+    }
+
+
+def make_response(games: int = 4, patches: int = 0) -> dict:
+    return {
+        "game_packages": [
+            {
+                "game": {"id": str(i), "biz": f"game{i}_global"},
+                "main": {
+                    "major": make_major("2.5.0"),
+                    "patches": [make_major("2.4.0") for _ in range(patches)],
+                },
+                "pre_download": {"major": None, "patches": []},
+            }
+            for i in range(games)
+        ]
+    }
+
+
+def test_lazy_parse():
+    game_info = resource.from_dict(make_response())[0]
+    assert game_info._main is resource._UNPARSED
+    assert game_info._pre_download is resource._UNPARSED
+    main = game_info.main
+    assert main.major.version == "2.5.0"
+    assert main.major.game_pkgs[0].size == 123
+    assert main.major.audio_pkgs[0].language == VoicePackLanguage.English
+    assert game_info.main is main
+    # The raw data is kept until every field is parsed.
+    assert game_info._data is not None
+    assert game_info.pre_download.major is None
+    assert game_info._data is None
+
+
+def test_setter_releases_data():
+    game_info = resource.from_dict(make_response())[0]
+    game_info.pre_download = None
+    assert game_info._data is not None
+    assert game_info.main.major.version == "2.5.0"
+    assert game_info.pre_download is None
+    assert game_info._data is None
+
+
+def test_parse_from_threads():
+    threads = 8
+    switch_interval = sys.getswitchinterval()
+    # Switch threads often so they interleave while parsing.
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(50):
+            game_info = resource.from_dict(make_response(1, patches=20))[0]
+            barrier = Barrier(threads)
+
+            def parse(i: int):
+                barrier.wait()
+                if i % 2:
+                    return game_info.main
+                return game_info.pre_download
+
+            with ThreadPoolExecutor(threads) as pool:
+                results = list(pool.map(parse, range(threads)))
+            # Every thread gets the same parsed object.
+            assert all(x is game_info.main for x in results[1::2])
+            assert all(x is game_info.pre_download for x in results[::2])
+            assert game_info._data is None
+    finally:
+        sys.setswitchinterval(switch_interval)
@@ -0,0 +1,67 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from vollerei.game.genshin import functions as genshin_functions
+from vollerei.game.hsr import functions as hsr_functions
+from vollerei.game.version import sniff_version
+from vollerei.game.zzz import functions as zzz_functions
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class FakeGame:
+    def __init__(self, data_folder: Path):
+        self._data_folder = data_folder
+
+    def data_folder(self) -> Path:
+        return self._data_folder
+
+    def get_version_config(self) -> tuple[int, int, int]:
+        return (0, 0, 0)
+
+
+@pytest.mark.parametrize(
+    "functions, folder, expected",
+    [
+        (hsr_functions, "hsr", (2, 5, 0)),
+        (genshin_functions, "genshin", (4, 8, 0)),
+        (zzz_functions, "zzz", (1, 2, 0)),
+    ],
+)
+def test_get_version(functions, folder, expected):
+    assert functions.get_version(FakeGame(FIXTURES / folder)) == expected
+
+
+def test_get_version_falls_back_to_config(tmp_path):
+    assert hsr_functions.get_version(FakeGame(tmp_path)) == (0, 0, 0)
+
+
+def test_multi_digit_version(tmp_path):
+    data = (FIXTURES / "hsr" / "data.unity3d").read_bytes()
+    data_file = tmp_path / "data.unity3d"
+    data_file.write_bytes(data.replace(b"\x002.5.0&", b"\x003.10.12&"))
+    assert hsr_functions.get_version(FakeGame(tmp_path)) == (3, 10, 12)
+
+
+def test_zzz_null_terminator():
+    # The version before the offset isn't the game version.
+    data_file = FIXTURES / "zzz" / "globalgamemanagers"
+    assert sniff_version(data_file, offset=4000, terminator=b"\x00") == (1, 2, 0)
+    assert sniff_version(data_file, offset=0, terminator=b"\x00") == (1, 0, 0)
+
+
+def test_version_not_found():
+    data_file = FIXTURES / "hsr" / "data.unity3d"
+    assert sniff_version(data_file, offset=0x7D0, terminator=b"_") is None
+
+
+def test_cache_follows_file_changes(tmp_path):
+    data_file = tmp_path / "globalgamemanagers"
+    shutil.copy(FIXTURES / "genshin" / "globalgamemanagers", data_file)
+    assert sniff_version(data_file, offset=4000, terminator=b"_") == (4, 8, 0)
+    # A different size, the modification time may not change on coarse clocks.
+    data = data_file.read_bytes().replace(b"\x004.8.0_", b"\x005.10.0_")
+    data_file.write_bytes(data)
+    assert sniff_version(data_file, offset=4000, terminator=b"_") == (5, 10, 0)
@@ -12,6 +12,7 @@ class GameABC(ABC):
 
     path: Path
     cache: Path
+    hash_index: Any
     version_override: tuple[int, int, int] | None
     channel_override: Any
 
@@ -93,11 +94,7 @@ class GameABC(ABC):
         """
         Repairs multiple game files.
 
-        This will automatically handle backup and restore the file if the repair
-        fails.
-
-        This method is not multi-threaded, so it may take a while to repair
-        multiple files.
+        The old files are kept if the repair fails.
 
         Args:
             files (PathLike): The files to repair.
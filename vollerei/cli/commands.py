@@ -4,17 +4,30 @@ from cleo.commands.command import Command
 from cleo.helpers import option, argument
 from pathlib import PurePath
 from platform import system
+from threading import Lock, Thread
+from time import sleep
 from vollerei.abc.launcher.game import GameABC
+from vollerei.common import api
 from vollerei.common.api import resource
-from vollerei.common.enums import GameChannel, VoicePackLanguage
+from vollerei.common.enums import (
+    GameChannel,
+    RepairStrategy,
+    StorageType,
+    VerifyLevel,
+    VoicePackLanguage,
+)
+from vollerei.common.hashing import Hasher
+from vollerei.common.scrubber import Scrubber
+from vollerei.constants import ORPHAN_EXCLUDE
 from vollerei.cli import utils
 from vollerei.exceptions.game import GameError
 from vollerei.exceptions.patcher import PatcherError, PatchUpdateError
 from vollerei.genshin import Game as GenshinGame
 from vollerei.hsr import Game as HSRGame, Patcher as HSRPatcher
 from vollerei.hsr.patcher import PatchType as HSRPatchType
+from vollerei.utils import HDiffPatch
 from vollerei.zzz import Game as ZZZGame
-from vollerei import paths
+from vollerei import offline, paths
 
 patcher = HSRPatcher()
 
@@ -33,6 +46,15 @@ default_options = [
     option("temporary-path", "t", description="Temporary path", flag=False),
     option("silent", "s", description="Silent mode"),
     option("noconfirm", "y", description="Do not ask for confirmation (yes to all)"),
+    option(
+        "offline",
+        description="Don't use the network, use the imported metadata snapshot and the package path",
+    ),
+    option(
+        "package-path",
+        description="Path to the game packages to use instead of downloading them",
+        flag=False,
+    ),
 ]
 
 
@@ -40,11 +62,39 @@ class State:
     game: GameABC = None
 
 
+def _resolve_hpatchz() -> None:
+    try:
+        HDiffPatch().hpatchz()
+    except Exception:
+        # Patching reports the error if it's still there.
+        pass
+
+
+def _prefetch_game_info(game: GameABC) -> None:
+    # Getting the channel reads the game files, so it's done here too instead
+    # of delaying the prefetch.
+    try:
+        channel = game.channel_override or game.get_channel()
+        api.get_game_packages(channel)
+    except Exception:
+        # The command reports the error when it needs the information.
+        pass
+
+
 def callback(
     command: Command,
+    prefetch: bool = False,
+    hpatchz: bool = False,
 ):
     """
     Base callback for all commands
+
+    Args:
+        command (Command): The command.
+        prefetch (bool): Whether to start getting the launcher metadata in the
+            background, so it's fetched while the command does local work.
+        hpatchz (bool): Whether to start resolving (or downloading) hpatchz in
+            the background.
     """
     game_path = command.option("game-path")
     channel = command.option("channel")
@@ -57,6 +107,7 @@ def callback(
         channel = GameChannel(channel)
     if temporary_path:
         paths.set_base_path(temporary_path)
+    offline.set_offline(command.option("offline"), command.option("package-path"))
     if command.name.startswith("hsr"):
         State.game = HSRGame(game_path, temporary_path)
         patch_type = command.option("patch-type")
@@ -75,6 +126,10 @@ def callback(
         raise ValueError("Invalid game type")
     if channel:
         State.game.channel_override = channel
+    if prefetch:
+        Thread(target=_prefetch_game_info, args=(State.game,), daemon=True).start()
+    if hpatchz:
+        Thread(target=_resolve_hpatchz, daemon=True).start()
     utils.silent_message = silent
     if noconfirm:
         utils.no_confirm = noconfirm
@@ -111,7 +166,9 @@ def set_version_config(self: Command):
 class VoicepackListInstalled(Command):
     name = "hsr voicepack list-installed"
     description = "Get the installed voicepacks"
-    options = default_options
+    options = default_options + [
+        option("refresh", description="Check every voicepack file again"),
+    ]
 
     def handle(self):
         callback(command=self)
@@ -120,6 +177,26 @@ class VoicepackListInstalled(Command):
             for x in State.game.get_installed_voicepacks()
         ]
         self.line(f"Installed voicepacks: {', '.join(installed_voicepacks_str)}")
+        try:
+            inventory = State.game.get_voicepack_inventory(
+                refresh=self.option("refresh")
+            )
+        except Exception as e:
+            self.line_error(f"<warn>Couldn't get the voicepack sizes: {e}</warn>")
+            return
+        for info in inventory.values():
+            if info.manifest is None:
+                self.line(f"- <comment>{info.language.name}</comment>: no manifest")
+                continue
+            status = (
+                "complete"
+                if info.complete
+                else f"<warn>{len(info.missing)} files missing</warn>"
+            )
+            self.line(
+                f"- <comment>{info.language.name}</comment>: {info.installed_files}/{info.files} files, "
+                + f"{info.installed_size / 1000 / 1000:.2f}/{info.size / 1000 / 1000:.2f} MB ({status})"
+            )
 
 
 class VoicepackList(Command):
@@ -130,7 +207,7 @@ class VoicepackList(Command):
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, prefetch=True)
         pre_download = self.option("pre-download")
         remote_game = State.game.get_remote_game(pre_download=pre_download)
         available_voicepacks_str = [
@@ -153,7 +230,7 @@ class VoicepackInstall(Command):
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, prefetch=True)
         pre_download = self.option("pre-download")
         # Typing manually because pylance detect it as Any
         languages: list[str] = self.argument("language")
@@ -247,7 +324,7 @@ class VoicepackUpdate(Command):
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, prefetch=True, hpatchz=True)
         auto_repair = self.option("auto-repair")
         pre_download = self.option("pre-download")
         from_version = self.option("from-version")
@@ -554,10 +631,15 @@ class InstallCommand(Command):
     )
     options = default_options + [
         option("pre-download", description="Pre-download the game if available"),
+        option(
+            "scattered",
+            description="Download the game files one by one instead of the packages, "
+            + "this needs about half of the disk space",
+        ),
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, prefetch=True)
         pre_download = self.option("pre-download")
         progress = utils.ProgressIndicator(self)
         progress.start("Fetching install package information... ")
@@ -574,35 +656,47 @@ class InstallCommand(Command):
         if not self.confirm("Do you want to install the game?"):
             self.line("<error>Installation aborted.</error>")
             return
-        self.line("Downloading install package...")
-        first_pkg_out_path = None
-        for game_pkg in game_info.major.game_pkgs:
-            out_path = State.game.cache.joinpath(PurePath(game_pkg.url).name)
-            if not first_pkg_out_path:
-                first_pkg_out_path = out_path
+        if self.option("scattered"):
+            progress = utils.ProgressIndicator(self)
+            progress.start("Downloading game files...")
             try:
-                download_result = utils.download(
-                    game_pkg.url, out_path, file_len=game_pkg.size
-                )
+                stats = State.game.install_scattered(game_info=game_info)
             except Exception as e:
-                self.line_error(
-                    f"<error>Couldn't download install package: {e}</error>"
+                progress.finish(
+                    f"<error>Couldn't install game files: {e} \n{traceback.format_exc()}</error>"
                 )
                 return
-            if not download_result:
-                self.line_error("<error>Download failed.</error>")
+            progress.finish(f"<comment>Downloaded {stats}</comment>")
+        else:
+            self.line("Downloading install package...")
+            first_pkg_out_path = None
+            for game_pkg in game_info.major.game_pkgs:
+                out_path = State.game.cache.joinpath(PurePath(game_pkg.url).name)
+                if not first_pkg_out_path:
+                    first_pkg_out_path = out_path
+                try:
+                    download_result = utils.download(
+                        game_pkg.url, out_path, file_len=game_pkg.size
+                    )
+                except Exception as e:
+                    self.line_error(
+                        f"<error>Couldn't download install package: {e}</error>"
+                    )
+                    return
+                if not download_result:
+                    self.line_error("<error>Download failed.</error>")
+                    return
+            self.line("Download completed.")
+            progress = utils.ProgressIndicator(self)
+            progress.start("Installing package...")
+            try:
+                State.game.install_archive(first_pkg_out_path)
+            except Exception as e:
+                progress.finish(
+                    f"<error>Couldn't install package: {e} \n{traceback.format_exc()}</error>"
+                )
                 return
-        self.line("Download completed.")
-        progress = utils.ProgressIndicator(self)
-        progress.start("Installing package...")
-        try:
-            State.game.install_archive(first_pkg_out_path)
-        except Exception as e:
-            progress.finish(
-                f"<error>Couldn't install package: {e} \n{traceback.format_exc()}</error>"
-            )
-            return
-        progress.finish("<comment>Package applied for the base game.</comment>")
+            progress.finish("<comment>Package applied for the base game.</comment>")
         self.line("Setting version config... ")
         State.game.version_override = game_info.major.version
         set_version_config(self=self)
@@ -626,7 +720,7 @@ class UpdateCommand(Command):
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, prefetch=True, hpatchz=True)
         auto_repair = self.option("auto-repair")
         pre_download = self.option("pre-download")
         from_version = self.option("from-version")
@@ -658,6 +752,26 @@ class UpdateCommand(Command):
         if not self.confirm("Do you want to update the game?"):
             self.line("<error>Update aborted.</error>")
             return
+        staging_path = State.game.get_staged_update(update_diff)
+        if staging_path:
+            progress = utils.ProgressIndicator(self)
+            progress.start("Applying staged update...")
+            try:
+                State.game.apply_staged_update(staging_path, auto_repair=auto_repair)
+            except Exception as e:
+                progress.finish(
+                    f"<error>Couldn't apply staged update: {e} \n{traceback.format_exc()}</error>"
+                )
+                return
+            progress.finish("<comment>Staged update applied.</comment>")
+            self.line("Setting version config... ")
+            State.game.version_override = game_info.major.version
+            set_version_config(self=self)
+            State.game.version_override = None
+            self.line(
+                f"The game has been updated to version: <comment>{State.game.get_version_str()}</comment>"
+            )
+            return
         self.line("Downloading update package...")
         update_game_url = update_diff.game_pkgs[0].url
         out_path = State.game.cache.joinpath(PurePath(update_game_url).name)
@@ -733,31 +847,361 @@ class UpdateCommand(Command):
 class RepairCommand(Command):
     name = "hsr repair"
     description = "Tries to repair the local game"
-    options = default_options
+    options = default_options + [
+        option(
+            "level",
+            "l",
+            description="Verification level (quick, standard or paranoid)",
+            flag=False,
+            default="standard",
+        ),
+        option(
+            "storage",
+            description="Storage type of the game drive (hdd, ssd or nvme)",
+            flag=False,
+            default="ssd",
+        ),
+        option("workers", description="Number of hashing threads", flag=False),
+        option("processes", description="Hash large files in separate processes"),
+        option(
+            "check-extra",
+            description="Also check the files which aren't listed in pkg_version",
+        ),
+        option(
+            "streaming",
+            description="Download broken files while the other files are still being verified",
+        ),
+        option(
+            "strategy",
+            description="How to download broken files (auto, scattered or archive)",
+            flag=False,
+            default="auto",
+        ),
+        option(
+            "keep-packages",
+            description="Keep the packages downloaded by the archive strategy in the cache",
+        ),
+        option(
+            "quick",
+            description="Only check the file sizes and hash a sample of the files",
+        ),
+        option(
+            "sample",
+            description="Number of files to hash with --quick",
+            flag=False,
+            default="128",
+        ),
+        option(
+            "voicepack",
+            description="Only repair the specified voicepack",
+            flag=False,
+            multiple=True,
+        ),
+    ]
 
     def handle(self):
-        callback(command=self)
-        self.line(
-            "This command will try to repair the game by downloading missing/broken files."
+        callback(command=self, prefetch=True)
+        try:
+            level = VerifyLevel[self.option("level").capitalize()]
+        except KeyError:
+            self.line_error(
+                f"<error>Invalid verification level: {self.option('level')}</error>"
+            )
+            return
+        storage = {x.name.lower(): x for x in StorageType}.get(
+            self.option("storage").lower()
+        )
+        if storage is None:
+            self.line_error(
+                f"<error>Invalid storage type: {self.option('storage')}</error>"
+            )
+            return
+        try:
+            strategy = RepairStrategy[self.option("strategy").capitalize()]
+        except KeyError:
+            self.line_error(
+                f"<error>Invalid repair strategy: {self.option('strategy')}</error>"
+            )
+            return
+        voicepacks = None
+        if self.option("voicepack"):
+            voicepacks = []
+            for language in self.option("voicepack"):
+                language = language.lower()
+                try:
+                    voicepacks.append(VoicePackLanguage[language.capitalize()])
+                except KeyError:
+                    try:
+                        voicepacks.append(VoicePackLanguage.from_remote_str(language))
+                    except ValueError:
+                        self.line_error(f"<error>Invalid language: {language}</error>")
+                        return
+        workers = self.option("workers")
+        hasher = Hasher(
+            storage=storage,
+            workers=int(workers) if workers else None,
+            use_processes=self.option("processes"),
         )
+        if self.option("quick"):
+            self._quick_check(hasher, voicepacks, strategy)
+            return
         self.line(
-            "There will be no progress available, so please be patient and just wait."
+            "This command will try to repair the game by downloading missing/broken files."
         )
         if not self.confirm(
             "Do you want to repair the game (this will take a long time!)?"
         ):
             self.line("<error>Repairation aborted.</error>")
             return
+        self.line("Repairing game files...")
+        progress_bar = self.progress_bar()
+        progress_bar.set_format(" %current% files downloaded %elapsed:6s% %message%")
+        progress_bar.set_message("")
+        # The downloader reports progress from its worker threads.
+        progress_lock = Lock()
+
+        def progress(result, stats):
+            with progress_lock:
+                progress_bar.set_message(
+                    f"{stats.bytes / 1000 / 1000:.2f} MB ({stats.throughput:.2f} MB/s)"
+                )
+                progress_bar.set_progress(stats.files)
+
+        def finish_progress():
+            progress_bar.finish()
+            # The progress bar doesn't end its line, if it was shown at all.
+            if progress_bar.get_progress():
+                self.line_error("")
+
+        try:
+            State.game.repair_game(
+                level=level,
+                hasher=hasher,
+                check_extra_files=self.option("check-extra"),
+                voicepacks=voicepacks,
+                streaming=self.option("streaming"),
+                strategy=strategy,
+                keep_packages=self.option("keep-packages"),
+                progress=progress,
+            )
+        except Exception as e:
+            finish_progress()
+            self.line_error(
+                f"<error>Repairation failed with following error: {e} \n{traceback.format_exc()}</error>"
+            )
+            return
+        finish_progress()
+        self.line("<comment>Repairation completed.</comment>")
+        self.line(f"Hashed <comment>{hasher.stats}</comment>")
+
+    def _quick_check(self, hasher, voicepacks, strategy):
         progress = utils.ProgressIndicator(self)
-        progress.start("Repairing game files (no progress available)... ")
+        progress.start("Checking game files... ")
         try:
-            State.game.repair_game()
+            result = State.game.quick_check(
+                sample_size=int(self.option("sample")),
+                hasher=hasher,
+                voicepacks=voicepacks,
+            )
+        except Exception as e:
+            progress.finish(
+                f"<error>Checking failed with following error: {e} \n{traceback.format_exc()}</error>"
+            )
+            return
+        progress.finish("<comment>Checking completed.</comment>")
+        for broken in result.broken:
+            self.line(f"<error>{broken}</error>")
+        self.line(f"Result: <comment>{result}</comment>")
+        if result.escalate:
+            self.line(
+                "Run this command without --quick to verify "
+                + f"<comment>{len(result.escalate)}</comment> unverified or broken files fully."
+            )
+        if not result.broken or not self.confirm(
+            f"Do you want to repair the {len(result.broken)} broken files now?"
+        ):
+            return
+        progress = utils.ProgressIndicator(self)
+        progress.start("Repairing broken files... ")
+        try:
+            stats = State.game.repair_files(
+                [x.path for x in result.broken],
+                strategy=strategy,
+                keep_packages=self.option("keep-packages"),
+            )
         except Exception as e:
             progress.finish(
                 f"<error>Repairation failed with following error: {e} \n{traceback.format_exc()}</error>"
             )
             return
-        progress.finish("<comment>Repairation completed.</comment>")
+        progress.finish(f"<comment>Repairation completed: {stats}</comment>")
+
+
+class RepairScrubCommand(Command):
+    name = "hsr repair scrub"
+    description = (
+        "Verifies the game in the background at low priority, "
+        + "rehashing changed files (Linux) and every file periodically"
+    )
+    options = default_options + [
+        option(
+            "interval",
+            description="Hours between full scrubs",
+            flag=False,
+            default="24",
+        ),
+        option(
+            "rate",
+            description="Maximum hashing speed in MB/s (1 MB = 1000000 bytes)",
+            flag=False,
+            default="32",
+        ),
+        option("repair", description="Repair broken files as soon as they're found"),
+        option("once", description="Run a full scrub once and exit"),
+    ]
+
+    def handle(self):
+        callback(command=self, prefetch=True)
+        scrubber = Scrubber(
+            State.game,
+            interval=float(self.option("interval")) * 60 * 60,
+            rate=int(float(self.option("rate")) * 1000 * 1000),
+            repair=self.option("repair"),
+            on_broken=lambda result: self.line(f"<error>{result}</error>"),
+        )
+        if self.option("once"):
+            progress = utils.ProgressIndicator(self)
+            progress.start("Scrubbing game files... ")
+            try:
+                broken = scrubber.scrub()
+            except Exception as e:
+                progress.finish(
+                    f"<error>Scrubbing failed with following error: {e} \n{traceback.format_exc()}</error>"
+                )
+                return
+            progress.finish(
+                f"<comment>Scrubbing completed, {len(broken)} broken files.</comment>"
+            )
+            self.line(f"Hashed <comment>{scrubber.hasher.stats}</comment>")
+            return
+        self.line("Scrubbing in the background, press Ctrl+C to stop.")
+        scrubber.start()
+        try:
+            while True:
+                sleep(1)
+        except KeyboardInterrupt:
+            self.line("Stopping...")
+            scrubber.stop()
+        self.line(f"Hashed <comment>{scrubber.hasher.stats}</comment>")
+
+
+class ChannelSwitchCommand(Command):
+    name = "hsr channel switch"
+    description = (
+        "Switches the game to another channel, only downloading the files "
+        + "which differ"
+    )
+    arguments = [
+        argument("target", description="Channel to switch to (overseas or china)")
+    ]
+    options = default_options
+
+    def handle(self):
+        # The current and the target channel are fetched concurrently, while
+        # the user answers the prompt.
+        callback(command=self, prefetch=True)
+        try:
+            target = GameChannel[self.argument("target").capitalize()]
+        except KeyError:
+            self.line_error(
+                f"<error>Invalid channel: {self.argument('target')}</error>"
+            )
+            return
+        api.prefetch([target])
+        if not self.confirm(
+            f"Do you want to switch the game to the {target.name} channel?"
+        ):
+            self.line("<error>Switch aborted.</error>")
+            return
+        progress = utils.ProgressIndicator(self)
+        progress.start("Switching channel... ")
+        try:
+            stats = State.game.switch_channel(target)
+        except Exception as e:
+            progress.finish(
+                f"<error>Switching channel failed with following error: {e} \n{traceback.format_exc()}</error>"
+            )
+            return
+        progress.finish(f"<comment>Switched to the {target.name} channel.</comment>")
+        self.line(f"Downloaded <comment>{stats}</comment>")
+
+
+class ReclaimCommand(Command):
+    name = "hsr reclaim"
+    description = "Removes the files which aren't part of the game to free up space"
+    options = default_options + [
+        option(
+            "delete",
+            description="Delete the files instead of moving them to the trash folder",
+        ),
+        option(
+            "exclude",
+            description="Glob pattern of the files to keep (in addition to the defaults)",
+            flag=False,
+            multiple=True,
+        ),
+    ]
+
+    def handle(self):
+        callback(command=self)
+        progress = utils.ProgressIndicator(self)
+        progress.start("Finding orphan files... ")
+        try:
+            orphans = State.game.find_orphan_files(
+                exclude=ORPHAN_EXCLUDE + self.option("exclude")
+            )
+        except Exception as e:
+            progress.finish(
+                f"<error>Finding orphan files failed with following error: {e} \n{traceback.format_exc()}</error>"
+            )
+            return
+        progress.finish("<comment>Orphan files found.</comment>")
+        if not orphans:
+            self.line("There are no orphan files.")
+            return
+        for file, size in orphans:
+            self.line(
+                f"- {file.relative_to(State.game.path)} "
+                + f"(<comment>{size / 1000 / 1000:.2f} MB</comment>)"
+            )
+        total_size = sum(size for _, size in orphans)
+        self.line(
+            f"<comment>{len(orphans)}</comment> files, "
+            + f"<comment>{total_size / 1000 / 1000:.2f} MB</comment> in total."
+        )
+        action = "delete" if self.option("delete") else "move to the trash folder"
+        if not self.confirm(f"Do you want to {action} these files?"):
+            self.line("<error>Reclaiming aborted.</error>")
+            return
+        progress = utils.ProgressIndicator(self)
+        progress.start("Reclaiming space... ")
+        try:
+            result = State.game.reclaim_orphan_files(
+                orphans, delete=self.option("delete")
+            )
+        except Exception as e:
+            progress.finish(
+                f"<error>Reclaiming failed with following error: {e} \n{traceback.format_exc()}</error>"
+            )
+            return
+        progress.finish(f"<comment>{result}.</comment>")
+        for file, error in result.failed:
+            self.line_error(f"<error>Failed to remove {file}: {error}</error>")
+        if result.trash_path:
+            self.line(
+                f"The files are in <comment>{result.trash_path}</comment>, "
+                + "delete it once you've checked the game still works."
+            )
 
 
 class InstallDownloadCommand(Command):
@@ -771,7 +1215,7 @@ class InstallDownloadCommand(Command):
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, prefetch=True)
         pre_download = self.option("pre-download")
         progress = utils.ProgressIndicator(self)
         progress.start("Fetching install package information... ")
@@ -823,7 +1267,7 @@ class UpdateDownloadCommand(Command):
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, prefetch=True)
         auto_repair = self.option("auto-repair")
         pre_download = self.option("pre-download")
         from_version = self.option("from-version")
@@ -898,6 +1342,59 @@ class UpdateDownloadCommand(Command):
             self.line("Download completed.")
 
 
+class UpdateStageCommand(Command):
+    name = "hsr update stage"
+    description = (
+        "Downloads and prepares the update ahead of time (usually with --pre-download), "
+        + "so the update command only needs to apply it when it's released"
+    )
+    options = default_options + [
+        option("pre-download", description="Pre-download the game if available"),
+        option(
+            "from-version", description="Update from a specific version", flag=False
+        ),
+    ]
+
+    def handle(self):
+        callback(command=self, prefetch=True)
+        pre_download = self.option("pre-download")
+        from_version = self.option("from-version")
+        if from_version:
+            self.line(f"Updating from version: <comment>{from_version}</comment>")
+            State.game.version_override = from_version
+        progress = utils.ProgressIndicator(self)
+        progress.start("Checking for updates... ")
+        try:
+            update_diff = State.game.get_update(pre_download=pre_download)
+        except Exception as e:
+            progress.finish(
+                f"<error>Update checking failed with following error: {e} \n{traceback.format_exc()}</error>"
+            )
+            return
+        if update_diff is None:
+            progress.finish("<comment>Game is already updated.</comment>")
+            return
+        progress.finish("<comment>Update available.</comment>")
+        if State.game.get_staged_update(update_diff):
+            self.line("<comment>The update is already staged.</comment>")
+            return
+        if not self.confirm("Do you want to stage the update?"):
+            self.line("<error>Staging aborted.</error>")
+            return
+        progress = utils.ProgressIndicator(self)
+        progress.start("Downloading, verifying and extracting update packages...")
+        try:
+            staging_path = State.game.stage_update(update_diff)
+        except Exception as e:
+            progress.finish(
+                f"<error>Couldn't stage update: {e} \n{traceback.format_exc()}</error>"
+            )
+            return
+        progress.finish(
+            f"<comment>Update staged to</comment> <question>{staging_path}</question>"
+        )
+
+
 class ApplyInstallArchive(Command):
     name = "hsr install apply-archive"
     description = "Applies the install archive"
@@ -931,7 +1428,7 @@ class ApplyUpdateArchive(Command):
     ]
 
     def handle(self):
-        callback(command=self)
+        callback(command=self, hpatchz=True)
         update_archive = self.argument("path")
         auto_repair = self.option("auto-repair")
         progress = utils.ProgressIndicator(self)
@@ -947,10 +1444,52 @@ class ApplyUpdateArchive(Command):
         set_version_config(self=self)
 
 
+class SnapshotExportCommand(Command):
+    name = "hsr snapshot export"
+    description = (
+        "Exports the launcher metadata to a snapshot file for use in offline mode"
+    )
+    arguments = [argument("path", description="Path to the snapshot file")]
+    options = default_options
+
+    def handle(self):
+        callback(command=self)
+        path = self.argument("path")
+        channel = State.game.channel_override or State.game.get_channel()
+        progress = utils.ProgressIndicator(self)
+        progress.start("Exporting launcher metadata...")
+        try:
+            count = api.export_snapshot(path, [channel])
+        except Exception as e:
+            progress.finish(f"<error>Couldn't export snapshot: {e}</error>")
+            return
+        progress.finish(
+            f"<comment>Exported {count} responses to</comment> <question>{path}</question>"
+        )
+
+
+class SnapshotImportCommand(Command):
+    name = "hsr snapshot import"
+    description = "Imports the launcher metadata from a snapshot file"
+    arguments = [argument("path", description="Path to the snapshot file")]
+    options = default_options
+
+    def handle(self):
+        callback(command=self)
+        path = self.argument("path")
+        try:
+            count = api.import_snapshot(path)
+        except Exception as e:
+            self.line_error(f"<error>Couldn't import snapshot: {e}</error>")
+            return
+        self.line(f"<comment>Imported {count} responses.</comment>")
+
+
 # This is the list for HSR commands, we'll add Genshin commands later
 classes = [
     ApplyInstallArchive,
     ApplyUpdateArchive,
+    ChannelSwitchCommand,
     GetVersionCommand,
     InstallCommand,
     InstallDownloadCommand,
@@ -958,10 +1497,15 @@ classes = [
     PatchInstallCommand,
     PatchTelemetryCommand,
     PatchTypeCommand,
+    ReclaimCommand,
     RepairCommand,
+    RepairScrubCommand,
+    SnapshotExportCommand,
+    SnapshotImportCommand,
     UpdatePatchCommand,
     UpdateCommand,
     UpdateDownloadCommand,
+    UpdateStageCommand,
     VoicepackInstall,
     VoicepackList,
     VoicepackListInstalled,
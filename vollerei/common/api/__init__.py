@@ -1,35 +1,152 @@
 import requests
+from os import PathLike
+from threading import Thread
 from vollerei.common.api import resource
+from vollerei.common.api.cache import ApiCache
+from vollerei.common.concurrency import SingleFlight
 from vollerei.common.enums import GameChannel
 from vollerei.constants import LAUNCHER_API
+from vollerei.exceptions.network import OfflineError
 
 
 __all__ = ["GamePackage"]
 
+# Shared by every metadata request, change `api_cache.ttl` etc. to configure it.
+api_cache = ApiCache()
+# Concurrent callers (threads, several Game instances) share one request.
+flight = SingleFlight()
+
+
+def _get_resource_path(channel: GameChannel) -> dict:
+    match channel:
+        case GameChannel.Overseas:
+            return LAUNCHER_API.OS
+        case GameChannel.China:
+            return LAUNCHER_API.CN
+
+
+def _get_cache_key(channel: GameChannel) -> str:
+    resource_path = _get_resource_path(channel)
+    return f"{channel.name.lower()}-{resource_path['params']['launcher_id']}"
+
+
+def _get_game_packages(
+    channel: GameChannel, use_cache: bool
+) -> list[resource.GameInfo]:
+    resource_path = _get_resource_path(channel)
+    return resource.from_dict(
+        api_cache.get(
+            _get_cache_key(channel),
+            resource_path["url"] + LAUNCHER_API.RESOURCE_PATH,
+            params=resource_path["params"],
+            revalidate=not use_cache,
+        )["data"]
+    )
+
 
 def get_game_packages(
-    channel: GameChannel = GameChannel.Overseas,
+    channel: GameChannel = GameChannel.Overseas, use_cache: bool = True
 ) -> list[resource.GameInfo]:
     """
     Get game packages information from the launcher API.
 
-    Default channel is overseas.
+    Default channel is overseas. Responses are cached on disk, see `ApiCache`,
+    and concurrent calls for the same channel share a single request.
 
     Args:
         channel: Game channel to get the resource information from.
+        use_cache: Whether to use the cached response if it's fresh, otherwise
+            it's revalidated with the server.
 
     Returns:
         Resource: Game resource information.
     """
-    resource_path: dict = None
-    match channel:
-        case GameChannel.Overseas:
-            resource_path = LAUNCHER_API.OS
-        case GameChannel.China:
-            resource_path = LAUNCHER_API.CN
-    return resource.from_dict(
-        requests.get(
-            resource_path["url"] + LAUNCHER_API.RESOURCE_PATH,
-            params=resource_path["params"],
-        ).json()["data"]
+    return flight.do(
+        ("game_packages", channel, use_cache), _get_game_packages, channel, use_cache
     )
+
+
+def _prefetch(channel: GameChannel) -> None:
+    try:
+        get_game_packages(channel)
+    except Exception:
+        # The caller which needs the information gets the error instead.
+        pass
+
+
+def prefetch(channels: list[GameChannel] = None) -> list[Thread]:
+    """
+    Starts getting game packages information in the background, one thread
+    per channel so several channels are fetched concurrently.
+
+    Calls to `get_game_packages()` made while a prefetch is in flight wait for
+    it instead of making another request.
+
+    Args:
+        channels: Game channels to prefetch, defaults to overseas.
+
+    Returns:
+        list[Thread]: The prefetch threads.
+    """
+    threads = []
+    for channel in channels or [GameChannel.Overseas]:
+        thread = Thread(target=_prefetch, args=(channel,), daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def invalidate(channel: GameChannel = None) -> None:
+    """
+    Forgets the cached and in-flight game packages information, so the next
+    call gets fresh data from the server.
+
+    Args:
+        channel: Game channel to invalidate, defaults to every channel.
+    """
+    for x in [channel] if channel else list(GameChannel):
+        api_cache.invalidate(_get_cache_key(x))
+    # Requests in flight may be for this channel, let new callers start over.
+    flight.forget()
+
+
+def export_snapshot(file: PathLike, channels: list[GameChannel] = None) -> int:
+    """
+    Exports the game packages information to a snapshot file, for use in
+    offline mode (see `vollerei.offline`) on another machine.
+
+    The information is fetched first if it isn't cached yet.
+
+    Args:
+        file: The snapshot file.
+        channels: Game channels to export, defaults to every channel which
+            can be fetched.
+
+    Returns:
+        int: How many responses were exported.
+    """
+    keys = []
+    for channel in channels or list(GameChannel):
+        try:
+            get_game_packages(channel)
+        except (requests.RequestException, OfflineError):
+            if channels:
+                raise
+            continue
+        keys.append(_get_cache_key(channel))
+    return api_cache.export_snapshot(file, keys)
+
+
+def import_snapshot(file: PathLike) -> int:
+    """
+    Imports game packages information from a snapshot file.
+
+    Args:
+        file: The snapshot file.
+
+    Returns:
+        int: How many responses were imported.
+    """
+    count = api_cache.import_snapshot(file)
+    flight.forget()
+    return count
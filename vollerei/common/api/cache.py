@@ -0,0 +1,224 @@
+import json
+import os
+import requests
+from os import PathLike
+from pathlib import Path, PurePath
+from threading import Lock, Thread
+from time import time
+from vollerei import offline, paths
+from vollerei.exceptions.network import OfflineError
+
+_SNAPSHOT_VERSION = 1
+
+
+class ApiCache:
+    """
+    On-disk cache of launcher API responses.
+
+    Responses are stored with their `ETag` and `Last-Modified` headers:
+
+    - Responses younger than `ttl` seconds are used without any request.
+    - Older responses are revalidated with a conditional request, so an
+      unchanged response costs a "304 Not Modified" instead of the payload.
+    - Responses younger than `ttl + stale_while_revalidate` are used right
+      away while they're revalidated in the background.
+    - If the revalidation fails (e.g. no network), the stale response is used.
+
+    Responses are also kept in memory, so a process reads each one from disk
+    (or the network) at most once per `ttl`.
+
+    In offline mode (see `vollerei.offline`) the cached responses are used
+    whatever their age, and they can be moved between machines as snapshots,
+    see `export_snapshot()` and `import_snapshot()`.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl: float = 10 * 60,
+        stale_while_revalidate: float = 60 * 60,
+        timeout: float = 15,
+    ):
+        self._path = Path(path) if path else None
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timeout = timeout
+        self._memo: dict[str, dict] = {}
+        self._lock = Lock()
+
+    @property
+    def path(self) -> Path:
+        """
+        The cache folder, defaults to "api" in the launcher cache folder.
+        """
+        # paths.launcher_cache_path changes with paths.set_base_path()
+        return self._path or paths.launcher_cache_path.joinpath("api")
+
+    def _file(self, key: str) -> Path:
+        return self.path.joinpath(f"{key}.json")
+
+    def _load(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._memo.get(key)
+        if entry is not None:
+            return entry
+        try:
+            entry = json.loads(self._file(key).read_text())
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._memo[key] = entry
+        return entry
+
+    def _store(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self._memo[key] = entry
+        file = self._file(key)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = file.with_name(f"{file.name}.{os.getpid()}.tmp")
+        temp_file.write_text(json.dumps(entry))
+        # Atomic, so a background revalidation killed at exit can't break it.
+        os.replace(temp_file, file)
+
+    def _fetch(self, key: str, url: str, params: dict, entry: dict | None) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        rsp = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+        if rsp.status_code == 304 and entry is not None:
+            entry = dict(entry, fetched_at=time())
+        else:
+            rsp.raise_for_status()
+            entry = {
+                "url": url,
+                "params": params,
+                "etag": rsp.headers.get("ETag"),
+                "last_modified": rsp.headers.get("Last-Modified"),
+                "fetched_at": time(),
+                "data": rsp.json(),
+            }
+        self._store(key, entry)
+        return entry
+
+    def _revalidate(self, key: str, url: str, params: dict, entry: dict) -> None:
+        try:
+            self._fetch(key, url, params, entry)
+        except Exception:
+            # The stale response is still there for next time.
+            pass
+
+    def get(
+        self, key: str, url: str, params: dict = None, revalidate: bool = False
+    ) -> dict:
+        """
+        Gets a JSON response, from the cache if possible.
+
+        Args:
+            key (str): Cache key of the response, used as the file name.
+            url (str): The URL to request.
+            params (dict, optional): The query parameters.
+            revalidate (bool): Whether to revalidate the response even if it's
+                fresh. Defaults to False.
+
+        Returns:
+            dict: The JSON response.
+        """
+        params = params or {}
+        entry = self._load(key)
+        if entry is not None and (entry["url"], entry["params"]) != (url, params):
+            entry = None
+        if offline.enabled:
+            if entry is None:
+                raise OfflineError(
+                    f"No cached response for {key}, import a snapshot to use offline mode."
+                )
+            return entry["data"]
+        if entry is None or revalidate:
+            return self._fetch(key, url, params, entry)["data"]
+        age = time() - entry["fetched_at"]
+        if age < self.ttl:
+            return entry["data"]
+        if age < self.ttl + self.stale_while_revalidate:
+            # Mark it as fresh for this process, so it's revalidated only once.
+            with self._lock:
+                self._memo[key] = dict(entry, fetched_at=time())
+            Thread(
+                target=self._revalidate, args=(key, url, params, entry), daemon=True
+            ).start()
+            return entry["data"]
+        try:
+            return self._fetch(key, url, params, entry)["data"]
+        except requests.RequestException:
+            return entry["data"]
+
+    def invalidate(self, key: str | None = None) -> None:
+        """
+        Removes a response (or every response) from the cache.
+
+        Args:
+            key (str, optional): The cache key, defaults to every response.
+        """
+        with self._lock:
+            if key is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(key, None)
+        files = [self._file(key)] if key else self.path.glob("*.json")
+        for file in files:
+            file.unlink(missing_ok=True)
+
+    def export_snapshot(self, file: PathLike, keys: list[str] | None = None) -> int:
+        """
+        Exports the cached responses to a snapshot file.
+
+        Args:
+            file (PathLike): The snapshot file.
+            keys (list[str], optional): The cache keys, defaults to every
+                cached response.
+
+        Returns:
+            int: How many responses were exported.
+        """
+        if keys is None:
+            keys = [x.stem for x in self.path.glob("*.json")]
+        entries = {}
+        for key in keys:
+            entry = self._load(key)
+            if entry is not None:
+                entries[key] = entry
+        Path(file).write_text(
+            json.dumps(
+                {
+                    "version": _SNAPSHOT_VERSION,
+                    "created_at": time(),
+                    "entries": entries,
+                }
+            )
+        )
+        return len(entries)
+
+    def import_snapshot(self, file: PathLike) -> int:
+        """
+        Imports the responses from a snapshot file into the cache.
+
+        The responses keep the time they were fetched at, so when online they're
+        revalidated as usual.
+
+        Args:
+            file (PathLike): The snapshot file.
+
+        Returns:
+            int: How many responses were imported.
+        """
+        snapshot = json.loads(Path(file).read_text())
+        if snapshot.get("version") != _SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+        for key, entry in snapshot["entries"].items():
+            # Keys are file names.
+            if PurePath(key).name != key or key.startswith("."):
+                raise ValueError(f"Invalid key in the snapshot: {key}")
+            self._store(key, entry)
+        return len(snapshot["entries"])
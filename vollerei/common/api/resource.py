@@ -1,8 +1,15 @@
+from threading import Lock
 from vollerei.common.enums import VoicePackLanguage
 from typing import Union
 
 
+# Marks lazily parsed fields which haven't been parsed yet (None is a value).
+_UNPARSED = object()
+
+
 class Game:
+    __slots__ = ("id", "biz")
+
     def __init__(self, id: str, biz: str):
         self.id = id
         self.biz = biz
@@ -13,6 +20,8 @@ class Game:
 
 
 class GamePackage:
+    __slots__ = ("url", "md5", "size", "decompressed_size")
+
     def __init__(self, url: str, md5: str, size: int, decompressed_size: int):
         self.url = url
         self.md5 = md5
@@ -35,6 +44,8 @@ class GamePackage:
 
 
 class AudioPackage:
+    __slots__ = ("language", "url", "md5", "size", "decompressed_size")
+
     def __init__(
         self,
         language: VoicePackLanguage,
@@ -66,6 +77,8 @@ class AudioPackage:
 
 
 class Major:
+    __slots__ = ("version", "game_pkgs", "audio_pkgs", "res_list_url")
+
     def __init__(
         self,
         version: str,
@@ -93,6 +106,8 @@ Patch = Major
 
 
 class Main:
+    __slots__ = ("major", "patches")
+
     def __init__(self, major: Major, patches: list[Patch]):
         self.major = major
         self.patches = patches
@@ -106,6 +121,8 @@ class Main:
 
 
 class PreDownload:
+    __slots__ = ("major", "patches")
+
     def __init__(self, major: Major | str | None, patches: list[Patch]):
         self.major = major
         self.patches = patches
@@ -135,18 +152,70 @@ class PreDownload:
 
 # Why miHoYo uses the same name "game_packages" for this big field and smol field
 class GameInfo:
+    """
+    Game packages information of a game.
+
+    When created with `from_dict()` only the game is parsed, `main` and
+    `pre_download` are parsed from the raw response the first time they're
+    used, since usually only one game of the response is needed. Parsing is
+    done under a lock, so the information can be shared between threads.
+    """
+
+    __slots__ = ("game", "_main", "_pre_download", "_data", "_lock")
+
     def __init__(self, game: Game, main: Main, pre_download: PreDownload):
         self.game = game
-        self.main = main
-        self.pre_download = pre_download
+        self._main = main
+        self._pre_download = pre_download
+        self._data: dict | None = None
+        self._lock = Lock()
+
+    @property
+    def main(self) -> Main:
+        if self._main is _UNPARSED:
+            with self._lock:
+                if self._main is _UNPARSED:
+                    self._main = Main.from_dict(self._data["main"])
+                    self._release_data()
+        return self._main
+
+    @main.setter
+    def main(self, main: Main) -> None:
+        with self._lock:
+            self._main = main
+            self._release_data()
+
+    @property
+    def pre_download(self) -> PreDownload | None:
+        if self._pre_download is _UNPARSED:
+            with self._lock:
+                if self._pre_download is _UNPARSED:
+                    self._pre_download = PreDownload.from_dict(
+                        self._data["pre_download"]
+                    )
+                    self._release_data()
+        return self._pre_download
+
+    @pre_download.setter
+    def pre_download(self, pre_download: PreDownload | None) -> None:
+        with self._lock:
+            self._pre_download = pre_download
+            self._release_data()
+
+    def _release_data(self) -> None:
+        # Called with the lock held
+        if self._main is not _UNPARSED and self._pre_download is not _UNPARSED:
+            self._data = None
 
     @staticmethod
     def from_dict(data: dict) -> "GameInfo":
-        return GameInfo(
+        game_info = GameInfo(
             game=Game.from_dict(data["game"]),
-            main=Main.from_dict(data["main"]),
-            pre_download=PreDownload.from_dict(data["pre_download"]),
+            main=_UNPARSED,
+            pre_download=_UNPARSED,
         )
+        game_info._data = data
+        return game_info
 
 
 def from_dict(data: dict) -> list[GameInfo]:
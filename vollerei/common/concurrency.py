@@ -0,0 +1,225 @@
+from collections import deque
+from threading import Condition, Event, Lock
+from time import monotonic, sleep
+from typing import Callable, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class AIMDController:
+    """
+    Adaptive concurrency limit for many small requests (AIMD).
+
+    The window (how many requests may be in flight) is raised by `increase`
+    after each round of requests as long as the goodput keeps improving, and is
+    multiplied by `decrease` when a request fails, times out, or the latency
+    rises above `latency_tolerance` times the lowest latency seen so far.
+
+    Use `acquire()` and `release()` around each request.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        increase: int = 1,
+        decrease: float = 0.5,
+        latency_tolerance: float = 3.0,
+        goodput_interval: float = 5.0,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.goodput_interval = goodput_interval
+        self._window = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._condition = Condition()
+        # (time, bytes) of the successful requests in the goodput interval
+        self._samples: deque[tuple[float, int]] = deque()
+        self._min_latency: float | None = None
+        self._round_completed = 0
+        self._round_goodput = 0.0
+        self._last_decrease = 0.0
+
+    @property
+    def window(self) -> int:
+        """
+        How many requests may currently be in flight.
+        """
+        return int(self._window)
+
+    @property
+    def in_flight(self) -> int:
+        """
+        How many requests are currently in flight.
+        """
+        return self._in_flight
+
+    @property
+    def goodput(self) -> float:
+        """
+        Bytes per second of the successful requests, over the last
+        `goodput_interval` seconds.
+        """
+        with self._condition:
+            return self._goodput(monotonic())
+
+    def _goodput(self, now: float) -> float:
+        while self._samples and now - self._samples[0][0] > self.goodput_interval:
+            self._samples.popleft()
+        if not self._samples:
+            return 0.0
+        elapsed = max(now - self._samples[0][0], 1e-3)
+        return sum(x[1] for x in self._samples) / elapsed
+
+    def acquire(self) -> None:
+        """
+        Waits until a request may be started.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._window):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(
+        self, success: bool, nbytes: int = 0, latency: float | None = None
+    ) -> None:
+        """
+        Reports the outcome of a request started with `acquire()`.
+
+        Args:
+            success (bool): Whether the request succeeded, errors, timeouts and
+                throttling responses should be reported as failures.
+            nbytes (int): How many bytes were transferred.
+            latency (float, optional): Time to the first byte, in seconds.
+        """
+        now = monotonic()
+        with self._condition:
+            self._in_flight -= 1
+            if success and latency is not None:
+                if self._min_latency is None or latency < self._min_latency:
+                    self._min_latency = latency
+            slow = (
+                latency is not None
+                and self._min_latency is not None
+                and latency > self._min_latency * self.latency_tolerance
+            )
+            if not success or slow:
+                # Only back off once per round trip, a burst of errors is one event.
+                round_trip = self._min_latency if self._min_latency else 1.0
+                if now - self._last_decrease > round_trip:
+                    self._window = max(self.minimum, self._window * self.decrease)
+                    self._last_decrease = now
+                self._round_completed = 0
+            else:
+                self._samples.append((now, nbytes))
+                self._round_completed += 1
+                if self._round_completed >= int(self._window):
+                    goodput = self._goodput(now)
+                    if goodput >= self._round_goodput:
+                        self._window = min(self.maximum, self._window + self.increase)
+                    self._round_goodput = goodput
+                    self._round_completed = 0
+            self._condition.notify_all()
+
+    def __str__(self) -> str:
+        return f"window {self.window}, goodput {self.goodput / 1000 / 1000:.2f} MB/s"
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many bytes are processed per second.
+
+    Amounts larger than the bucket can be consumed, the following calls then
+    wait until the bucket has refilled.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._last = monotonic()
+        self._lock = Lock()
+
+    def consume(self, amount: float) -> None:
+        """
+        Waits until `amount` bytes may be processed.
+        """
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            sleep(wait)
+
+
+class _Call:
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key.
+
+    While a call is in flight, other callers with the same key wait for it and
+    get its result (or exception) instead of making the call again.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Calls `fn(*args, **kwargs)`, or waits for the call in flight for `key`.
+
+        Returns:
+            T: The result of the call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def forget(self, key: Hashable | None = None) -> None:
+        """
+        Makes the next callers start a new call instead of waiting for the one
+        in flight, e.g. when its result is known to be outdated.
+
+        Args:
+            key (Hashable, optional): The key, defaults to every key.
+        """
+        with self._lock:
+            if key is None:
+                self._calls.clear()
+            else:
+                self._calls.pop(key, None)
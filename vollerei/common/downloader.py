@@ -0,0 +1,251 @@
+import concurrent.futures
+import hashlib
+import os
+import requests
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from threading import Lock, local
+from time import monotonic, sleep
+from typing import Callable, Iterable, Iterator
+from vollerei.common.concurrency import AIMDController
+from vollerei.exceptions.game import ChecksumMismatchError
+
+
+class DownloadResult:
+    """
+    The result of downloading a file.
+
+    `error` is `None` if the file was downloaded (and verified) successfully,
+    in that case `md5` is the verified MD5 checksum (if it was known).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dest: Path,
+        size: int = 0,
+        md5: str | None = None,
+        error: Exception | None = None,
+    ):
+        self.path = path
+        self.dest = dest
+        self.size = size
+        self.md5 = md5
+        self.error = error
+
+
+class DownloadStats:
+    """
+    Statistics of a `ScatteredDownloader`.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.failed = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Download throughput in MB/s.
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.bytes / 1000 / 1000 / self.elapsed
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files ({self.failed} failed), "
+            + f"{self.bytes / 1000 / 1000:.2f} MB in {self.elapsed:.2f}s "
+            + f"({self.throughput:.2f} MB/s)"
+        )
+
+
+class ScatteredDownloader:
+    """
+    Downloads individual game files ("scattered files") from `res_list_url`.
+
+    Files are downloaded in parallel with one HTTP session per thread, so
+    connections are reused between files. Each file is written to a temporary
+    file next to its destination, verified against the expected MD5 checksum and
+    size, then atomically moved into place, so a failed download never leaves a
+    broken file behind.
+
+    If a `controller` is given, the number of concurrent requests is adjusted
+    by it (up to its maximum) instead of being fixed to `workers`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        workers: int = 8,
+        retries: int = 3,
+        timeout: float = 30,
+        progress: Callable[[DownloadResult, DownloadStats], None] = None,
+        controller: AIMDController = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.controller = controller
+        self.workers = controller.maximum if controller else workers
+        self.retries = retries
+        self.timeout = timeout
+        self.progress = progress
+        self.stats = DownloadStats()
+        self._stats_lock = Lock()
+        self._local = local()
+        # When the current `download_files()` call started, minus the time
+        # spent in the previous ones, to keep `stats.elapsed` up to date.
+        self._start: float | None = None
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def _download(self, path: str, dest: Path, md5: str | None, size: int | None):
+        url = self.base_url + "/" + path
+        temp_file = dest.with_name(dest.name + ".tmp")
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        file_hash = hashlib.md5()
+        file_size = 0
+        try:
+            with self._session().get(url, stream=True, timeout=self.timeout) as rsp:
+                latency = rsp.elapsed.total_seconds()
+                rsp.raise_for_status()
+                with temp_file.open("wb") as f:
+                    for chunk in rsp.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+                        file_hash.update(chunk)
+                        file_size += len(chunk)
+            if size is not None and file_size != size:
+                raise ChecksumMismatchError(
+                    f"Size mismatch for {path} ({file_size}; expected {size})"
+                )
+            if md5 is not None and file_hash.hexdigest() != md5.lower():
+                raise ChecksumMismatchError(
+                    f"Hash mismatch for {path} ({file_hash.hexdigest()}; expected {md5})"
+                )
+            os.replace(temp_file, dest)
+        except BaseException:
+            temp_file.unlink(missing_ok=True)
+            raise
+        return file_size, latency
+
+    def _attempt(self, path: str, dest: Path, md5: str | None, size: int | None) -> int:
+        if self.controller is None:
+            return self._download(path, dest, md5, size)[0]
+        self.controller.acquire()
+        # Only errors which mean the server is overloaded (or the connection
+        # is) should make the controller back off.
+        success, file_size, latency = False, 0, None
+        try:
+            file_size, latency = self._download(path, dest, md5, size)
+            success = True
+            return file_size
+        except ChecksumMismatchError:
+            success = True
+            raise
+        except requests.HTTPError as e:
+            status = e.response.status_code
+            success = status < 500 and status != 429
+            raise
+        finally:
+            self.controller.release(success, file_size, latency)
+
+    def download_file(
+        self, path: str, dest: Path, md5: str | None = None, size: int | None = None
+    ) -> DownloadResult:
+        """
+        Downloads a file, retrying if the download or the verification fails.
+
+        Client errors (e.g. 404) aren't retried.
+
+        Args:
+            path (str): The file path relative to `base_url`.
+            dest (Path): Where to save the file.
+            md5 (str, optional): The expected MD5 checksum.
+            size (int, optional): The expected file size.
+
+        Returns:
+            DownloadResult: The download result, errors are returned instead
+                of raised.
+        """
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                sleep(min(2**attempt * 0.5, 10))
+            try:
+                file_size = self._attempt(path, dest, md5, size)
+                result = DownloadResult(path, dest, file_size, md5=md5)
+                break
+            except requests.HTTPError as e:
+                error = e
+                # Client errors (e.g. a missing file) won't go away by retrying.
+                status = e.response.status_code
+                if 400 <= status < 500 and status not in (408, 429):
+                    result = DownloadResult(path, dest, error=error)
+                    break
+            except Exception as e:
+                error = e
+        else:
+            result = DownloadResult(path, dest, error=error)
+        with self._stats_lock:
+            if result.error:
+                self.stats.failed += 1
+            else:
+                self.stats.files += 1
+                self.stats.bytes += result.size
+            if self._start is not None:
+                self.stats.elapsed = monotonic() - self._start
+        if self.progress:
+            self.progress(result, self.stats)
+        return result
+
+    def download_files(
+        self, files: Iterable[tuple[str, Path, str | None, int | None]]
+    ) -> Iterator[DownloadResult]:
+        """
+        Downloads files in parallel, yielding the results as they complete.
+
+        `files` is consumed lazily, so it can be a generator which is still
+        producing files (e.g. while the game is being verified).
+
+        Args:
+            files (Iterable[tuple[str, Path, str | None, int | None]]):
+                (path, dest, md5, size) tuples, see `download_file()`.
+
+        Returns:
+            Iterator[DownloadResult]: The download results, in completion order.
+        """
+        self._start = monotonic() - self.stats.elapsed
+        executor = concurrent.futures.ThreadPoolExecutor(self.workers)
+        max_pending = self.workers * 4
+        pending: set[concurrent.futures.Future] = set()
+        try:
+            for path, dest, md5, size in files:
+                pending.add(executor.submit(self.download_file, path, dest, md5, size))
+                while len(pending) >= max_pending:
+                    done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            with self._stats_lock:
+                self.stats.elapsed = monotonic() - self._start
+                self._start = None
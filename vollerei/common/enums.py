@@ -8,6 +8,58 @@ class GameType(Enum):
     HI3 = 4
 
 
+class VerifyLevel(Enum):
+    """
+    How thoroughly the game files are verified.
+
+    Quick: Only checks if the files exist and have the expected size.
+    Standard: Additionally hashes the files which passed the quick check,
+        skipping the ones which haven't changed since they were last verified.
+    Paranoid: Hashes every file again, ignoring the hash index.
+    """
+
+    Quick = 0
+    Standard = 1
+    Paranoid = 2
+
+
+class FileStatus(Enum):
+    """
+    Verification status of a game file.
+    """
+
+    OK = 0
+    Missing = 1
+    SizeMismatch = 2
+    HashMismatch = 3
+    Unreadable = 4
+
+
+class StorageType(Enum):
+    """
+    Storage device type, used to pick sensible defaults for disk-heavy work.
+    """
+
+    HDD = 0
+    SSD = 1
+    NVMe = 2
+
+
+class RepairStrategy(Enum):
+    """
+    How broken game files are downloaded.
+
+    Auto: Picks the cheaper strategy based on the bytes and requests needed.
+    Scattered: Downloads each broken file from the scattered files server.
+    Archive: Downloads the game (or voicepack) packages and extracts the
+        broken files from them.
+    """
+
+    Auto = 0
+    Scattered = 1
+    Archive = 2
+
+
 class GameChannel(Enum):
     Overseas = 0
     China = 1
@@ -1,24 +1,71 @@
 import concurrent.futures
 import json
 import hashlib
+import heapq
+import math
+import os
 import multivolumefile
 import py7zr
+import queue
+import random
+import threading
 import zipfile
-from io import IOBase
+from contextlib import contextmanager
+from datetime import datetime
+from fnmatch import fnmatch
+from io import BufferedReader, IOBase
 from os import PathLike
-from pathlib import Path
-from shutil import move
+from pathlib import Path, PurePath
+from shutil import disk_usage, move, rmtree
+from stat import S_ISREG
+from time import monotonic, time
+from typing import Callable, Iterable, Iterator
+from vollerei import offline
 from vollerei.abc.launcher.game import GameABC
+from vollerei.constants import ORPHAN_EXCLUDE
 from vollerei.common.api import resource
+from vollerei.common.concurrency import AIMDController
+from vollerei.common.downloader import (
+    DownloadResult,
+    DownloadStats,
+    ScatteredDownloader,
+)
+from vollerei.common.enums import (
+    FileStatus,
+    RepairStrategy,
+    VerifyLevel,
+    VoicePackLanguage,
+)
+from vollerei.common.hashing import Hasher
+from vollerei.common.manifest import (
+    Manifest,
+    audio_manifest_language,
+    get_audio_manifests,
+)
 from vollerei.exceptions.game import (
+    ChecksumMismatchError,
     RepairError,
     GameNotInstalledError,
     ScatteredFilesNotAvailableError,
+    StagedUpdateError,
 )
-from vollerei.utils import HDiffPatch, HPatchZPatchError, download
+from vollerei.exceptions.network import OfflineError
+from vollerei.utils import download, HDiffPatch, HPatchZPatchError
 
 
 _hdiff = HDiffPatch()
+_UPDATE_METADATA_FILES = ["deletefiles.txt", "hdifffiles.txt", "hdiffmap.json"]
+
+
+def _relative_path(game: GameABC, file: Path) -> str:
+    # Wtf mihoyo, you build this game for Windows and then use Unix path separator :moyai:
+    return str(file.relative_to(game.path)).replace("\\", "/")
+
+
+def _forget_files(game: GameABC, files: list[str]) -> None:
+    # Files are rewritten, so their verified hashes are no longer valid.
+    game.hash_index.remove(files)
+    game.hash_index.commit()
 
 
 def _extract_files(
@@ -45,48 +92,50 @@ def _open_archive(file: Path | IOBase) -> py7zr.SevenZipFile | zipfile.ZipFile:
     return archive
 
 
-def apply_update_archive(
-    game: GameABC, archive_file: Path | IOBase, auto_repair: bool = True
-) -> None:
+@contextmanager
+def _open_package(
+    archive_file: Path | IOBase,
+) -> Iterator[py7zr.SevenZipFile | zipfile.ZipFile]:
     """
-    Applies an update archive to the game, it can be the game update or a
-    voicepack update.
-
-    Because this function is shared for all games, you should use the game's
-    `apply_update_archive()` method instead, which additionally applies required
-    methods for that game.
+    Opens an archive, split archives are opened from their first part (".001").
     """
-    # Most code here are copied from worthless-launcher.
-    # worthless-launcher uses asyncio for multithreading while this one uses
-    # ThreadPoolExecutor, probably better for this use case.
-
-    # We need `game` for the path and `auto_repair` for the auto repair option.
+    if not isinstance(archive_file, IOBase) and Path(archive_file).suffix == ".001":
+        # The volumes must stay open while the archive is being read.
+        with multivolumefile.open(Path(archive_file).with_suffix(""), mode="rb") as f:
+            # Reads stop at the end of each volume, buffering them makes
+            # short reads (which zipfile doesn't expect) impossible.
+            archive = _open_archive(BufferedReader(f))
+            try:
+                yield archive
+            finally:
+                archive.close()
+        return
+    archive = _open_archive(archive_file)
+    try:
+        yield archive
+    finally:
+        archive.close()
 
-    # Install HDiffPatch
-    _hdiff.hpatchz()
 
-    # Open archive
-    def reset_if_py7zr(archive):
-        if isinstance(archive, py7zr.SevenZipFile):
-            archive.reset()
+def _read_update_metadata(
+    archive: py7zr.SevenZipFile | zipfile.ZipFile,
+) -> tuple[list[str], list[tuple[str, str]]]:
+    """
+    Reads the files to delete and the files to patch from an update archive.
 
-    archive = _open_archive(archive_file)
+    The archive is reset afterwards if it's a 7z archive so it can be extracted.
 
-    # Get files list (we don't want to extract all of them)
-    files = archive.namelist()
-    # Don't extract these files (they're useless and if the game isn't patched then
-    # it'll raise 31-4xxx error in Genshin)
-    for file in ["deletefiles.txt", "hdifffiles.txt", "hdiffmap.json"]:
-        try:
-            files.remove(file)
-        except ValueError:
-            pass
+    Returns:
+        tuple[list[str], list[tuple[str, str]]]: The files to delete and the
+            (source file, target file) pairs to patch.
+    """
     # Think for me a better name for this variable
     txtfiles = None
     if isinstance(archive, py7zr.SevenZipFile):
         txtfiles = archive.read(["deletefiles.txt", "hdifffiles.txt", "hdiffmap.json"])
         # Reset archive to extract files
         archive.reset()
+    deletefiles: list[str] = []
     try:
         # miHoYo loves CRLF
         if txtfiles is not None:
@@ -97,20 +146,9 @@ def apply_update_archive(
             # Typing
             deletebytes: bytes
             deletebytes = deletebytes.decode()
-        deletefiles = deletebytes.split("\r\n")
+        deletefiles = [x for x in deletebytes.split("\r\n") if x]
     except (IOError, KeyError):
         pass
-    else:
-        for file_str in deletefiles:
-            file = game.path.joinpath(file_str)
-            if file == game.path:
-                # Don't delete the game folder
-                continue
-            if not file.relative_to(game.path):
-                # File is not in the game folder
-                continue
-            # Delete the file
-            file.unlink(missing_ok=True)
 
     # hdiffpatch implementation
     # Read hdifffiles.txt to get the files to patch
@@ -147,36 +185,109 @@ def apply_update_archive(
                 hdifffiles.append((name, name))
             except json.JSONDecodeError:
                 pass
+    return deletefiles, hdifffiles
 
-    # Patch function
-    def patch(source_file: Path, target_file: Path, patch_file: str):
-        patch_path = game.cache.joinpath(patch_file)
-        # Spaghetti code :(, fuck my eyes.
-        bak_src_file = source_file.rename(
-            source_file.with_suffix(source_file.suffix + ".bak")
-        )
-        try:
-            _hdiff.patch_file(bak_src_file, target_file, patch_path)
-        except HPatchZPatchError:
-            if auto_repair:
-                try:
-                    # The game repairs file by downloading the latest file, in this case we want the target file
-                    # instead of source file. Honestly I haven't tested this but I hope it works.
-                    game.repair_file(target_file)
-                except Exception:
-                    # Let the game download the file.
-                    bak_src_file.rename(file.with_suffix(""))
-                else:
-                    bak_src_file.unlink()
-            else:
+
+def _delete_files(game: GameABC, deletefiles: list[str]) -> None:
+    for file_str in deletefiles:
+        file = game.path.joinpath(file_str)
+        if file == game.path:
+            # Don't delete the game folder
+            continue
+        if not file.is_relative_to(game.path):
+            # File is not in the game folder
+            continue
+        # Delete the file
+        file.unlink(missing_ok=True)
+
+
+def _patch_file(
+    game: GameABC,
+    source_file: Path,
+    target_file: Path,
+    patch_path: Path,
+    auto_repair: bool = True,
+) -> None:
+    # Spaghetti code :(, fuck my eyes.
+    bak_src_file = source_file.rename(
+        source_file.with_suffix(source_file.suffix + ".bak")
+    )
+    try:
+        _hdiff.patch_file(bak_src_file, target_file, patch_path)
+    except HPatchZPatchError:
+        if auto_repair:
+            try:
+                # The game repairs file by downloading the latest file, in this case we want the target file
+                # instead of source file. Honestly I haven't tested this but I hope it works.
+                game.repair_file(target_file)
+            except Exception:
                 # Let the game download the file.
-                bak_src_file.rename(file.with_suffix(""))
-            return
+                bak_src_file.rename(source_file)
+            else:
+                bak_src_file.unlink()
         else:
-            # Remove old file, since we don't need it anymore.
-            bak_src_file.unlink()
-        finally:
-            patch_path.unlink()
+            # Let the game download the file.
+            bak_src_file.rename(source_file)
+        return
+    else:
+        # Remove old file, since we don't need it anymore.
+        bak_src_file.unlink()
+    finally:
+        patch_path.unlink()
+
+
+def _patch_files(
+    game: GameABC,
+    patch_jobs: list[tuple[Path, Path, Path]],
+    auto_repair: bool = True,
+) -> None:
+    # Create new ThreadPoolExecutor for patching
+    patch_executor = concurrent.futures.ThreadPoolExecutor()
+    for source_path, target_path, patch_path in patch_jobs:
+        patch_executor.submit(
+            _patch_file, game, source_path, target_path, patch_path, auto_repair
+        )
+    patch_executor.shutdown(wait=True)
+
+
+def apply_update_archive(
+    game: GameABC, archive_file: Path | IOBase, auto_repair: bool = True
+) -> None:
+    """
+    Applies an update archive to the game, it can be the game update or a
+    voicepack update.
+
+    Because this function is shared for all games, you should use the game's
+    `apply_update_archive()` method instead, which additionally applies required
+    methods for that game.
+    """
+    # Most code here are copied from worthless-launcher.
+    # worthless-launcher uses asyncio for multithreading while this one uses
+    # ThreadPoolExecutor, probably better for this use case.
+
+    # We need `game` for the path and `auto_repair` for the auto repair option.
+
+    # Install HDiffPatch
+    _hdiff.hpatchz()
+
+    # Open archive
+    def reset_if_py7zr(archive):
+        if isinstance(archive, py7zr.SevenZipFile):
+            archive.reset()
+
+    archive = _open_archive(archive_file)
+
+    # Get files list (we don't want to extract all of them)
+    files = archive.namelist()
+    # Don't extract these files (they're useless and if the game isn't patched then
+    # it'll raise 31-4xxx error in Genshin)
+    for file in _UPDATE_METADATA_FILES:
+        try:
+            files.remove(file)
+        except ValueError:
+            pass
+    deletefiles, hdifffiles = _read_update_metadata(archive)
+    _delete_files(game, deletefiles)
 
     # Multi-threaded patching
     patch_jobs = []
@@ -192,22 +303,144 @@ def apply_update_archive(
         files.remove(patch_file)
         # Add file to extract list
         patch_files.append(patch_file)
-        patch_jobs.append([patch, [source_path, target_path, patch_file]])
+        patch_jobs.append((source_path, target_path, game.cache.joinpath(patch_file)))
 
     # Extract patch files to temporary dir
     _extract_files(archive, patch_files, game.cache)
     reset_if_py7zr(archive)  # For the next extraction
-    # Create new ThreadPoolExecutor for patching
-    patch_executor = concurrent.futures.ThreadPoolExecutor()
-    for job in patch_jobs:
-        patch_executor.submit(job[0], *job[1])
-    patch_executor.shutdown(wait=True)
+    _patch_files(game, patch_jobs, auto_repair=auto_repair)
 
     # Extract files from archive after we have filtered out the patch files
     _extract_files(archive, files, game.path)
 
     # Close the archive
     archive.close()
+    _forget_files(
+        game, deletefiles + [target_file for _, target_file in hdifffiles] + files
+    )
+
+
+def verify_package(file: Path, md5: str) -> bool:
+    """
+    Checks if a downloaded package matches the MD5 checksum from the server.
+
+    Args:
+        file (Path): The package file.
+        md5 (str): The expected MD5 checksum.
+
+    Returns:
+        bool: True if the checksum matches, False otherwise.
+    """
+    if not file.is_file():
+        return False
+    with file.open("rb") as f:
+        file_hash = hashlib.file_digest(f, "md5").hexdigest()
+    return file_hash.lower() == md5.lower()
+
+
+def stage_update_archive(game: GameABC, archive_file: Path, staging_path: Path) -> dict:
+    """
+    Prepares an update archive ahead of time so it can be applied quickly later.
+
+    The archive metadata is parsed and every file (including the hdiff patches)
+    is extracted to `staging_path`, so applying the staged update only needs
+    patching and renaming files.
+
+    Args:
+        game (GameABC): The game to stage the update for.
+        archive_file (Path): The update archive.
+        staging_path (Path): The folder to extract the archive to.
+
+    Returns:
+        dict: The staged package plan, which is used by `apply_staged_update()`.
+    """
+    archive = _open_archive(archive_file)
+    files = archive.namelist()
+    for file in _UPDATE_METADATA_FILES:
+        try:
+            files.remove(file)
+        except ValueError:
+            pass
+    deletefiles, hdifffiles = _read_update_metadata(archive)
+    staging_path.mkdir(parents=True, exist_ok=True)
+    _extract_files(archive, files, staging_path)
+    archive.close()
+    patch_files = set(target_file + ".hdiff" for _, target_file in hdifffiles)
+    return {
+        "name": Path(archive_file).name,
+        "path": str(staging_path),
+        "deletefiles": deletefiles,
+        "hdifffiles": hdifffiles,
+        # Directories are also listed in the archive, we only want files.
+        "files": [
+            x
+            for x in files
+            if x not in patch_files and staging_path.joinpath(x).is_file()
+        ],
+    }
+
+
+def _move_file(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # Atomic if both files are on the same filesystem
+        source.replace(target)
+    except OSError:
+        move(source, target)
+
+
+def apply_staged_update(
+    game: GameABC, staging_path: Path, auto_repair: bool = True
+) -> None:
+    """
+    Applies an update staged by `stage_update_archive()`.
+
+    Because this function is shared for all games, you should use the game's
+    `apply_staged_update()` method instead, which additionally applies required
+    methods for that game.
+
+    Args:
+        game (GameABC): The game to apply the update to.
+        staging_path (Path): The staging folder which contains "plan.json".
+        auto_repair (bool, optional): Whether to repair the file if it's broken.
+            Defaults to True.
+    """
+    plan_file = staging_path.joinpath("plan.json")
+    if not plan_file.is_file():
+        raise StagedUpdateError("Staged update plan not found.")
+    plan = json.loads(plan_file.read_text())
+    version = (
+        ".".join(str(x) for x in game.version_override)
+        if game.version_override
+        else ".".join(str(x) for x in game.get_version())
+    )
+    if plan["from_version"] != version:
+        raise StagedUpdateError(
+            f"Staged update is for version {plan['from_version']}, but the game is at version {version}."
+        )
+    _hdiff.hpatchz()
+    for package in plan["packages"]:
+        package_path = Path(package["path"])
+        _delete_files(game, package["deletefiles"])
+        patch_jobs = []
+        for source_file, target_file in package["hdifffiles"]:
+            source_path = game.path.joinpath(source_file)
+            if not source_path.exists():
+                continue
+            patch_path = package_path.joinpath(target_file + ".hdiff")
+            patch_jobs.append(
+                (source_path, game.path.joinpath(target_file), patch_path)
+            )
+        _patch_files(game, patch_jobs, auto_repair=auto_repair)
+        for file in package["files"]:
+            _move_file(package_path.joinpath(file), game.path.joinpath(file))
+        _forget_files(
+            game,
+            package["deletefiles"]
+            + [target_file for _, target_file in package["hdifffiles"]]
+            + package["files"],
+        )
+    rmtree(staging_path, ignore_errors=True)
 
 
 def install_archive(game: GameABC, archive_file: Path | IOBase) -> None:
@@ -224,50 +457,384 @@ def install_archive(game: GameABC, archive_file: Path | IOBase) -> None:
     `install_archive()` method instead, which additionally applies required
     methods for that game.
     """
-    archive: py7zr.SevenZipFile | zipfile.ZipFile = None
-    archive_path = Path(archive_file)
-    if archive_path.suffix == ".001":
-        archive_path = archive_path.with_suffix("")
-        with multivolumefile.open(archive_path, mode='rb') as target_archive:
-            # TODO: Implement for .zip file (but I doubt it's needed cuz miHoYo uses 7z)
-            archive = py7zr.SevenZipFile(target_archive, "r")
-    else:
-        archive = _open_archive(archive_file)
-    archive.extractall(game.path)
-    archive.close()
+    with _open_package(archive_file) as archive:
+        files = archive.namelist()
+        archive.extractall(game.path)
+    _forget_files(game, files)
+
+
+def _load_manifest(game: GameABC) -> Manifest:
+    # pkg_version may be the file we're repairing
+    if not game.path.joinpath("pkg_version").is_file():
+        return Manifest()
+    return Manifest.from_game(game)
+
+
+def _repair_jobs(
+    game: GameABC, files: Iterable[Path], manifest: Manifest
+) -> Iterator[tuple[str, Path, str | None, int | None]]:
+    for file in files:
+        relative_path_str = _relative_path(game, file)
+        entry = manifest.get(relative_path_str)
+        if entry is None:
+            yield relative_path_str, file, None, None
+        else:
+            yield relative_path_str, file, entry.md5, entry.size
+
+
+def _repair_with(
+    game: GameABC,
+    downloader: ScatteredDownloader,
+    jobs: Iterable[tuple[str, Path, str | None, int | None]],
+) -> DownloadStats:
+    failed: list[str] = []
+    for result in downloader.download_files(jobs):
+        if result.error:
+            print(f"Failed to repair {result.path}: {result.error}")
+            failed.append(result.path)
+            continue
+        if result.md5:
+            game.hash_index.set(result.path, result.dest.stat(), result.md5)
+        else:
+            game.hash_index.remove([result.path])
+    game.hash_index.commit()
+    if failed:
+        raise RepairError(f"Failed to repair {len(failed)} files: {', '.join(failed)}")
+    return downloader.stats
+
+
+def _get_downloader(
+    game: GameABC,
+    game_info: resource.Main,
+    workers: int = 8,
+    retries: int = 3,
+    progress: Callable[[DownloadResult, DownloadStats], None] = None,
+    adaptive: bool = True,
+) -> ScatteredDownloader:
+    if not game_info.major or not game_info.major.res_list_url:
+        raise ScatteredFilesNotAvailableError("Scattered files are not available.")
+    if offline.enabled:
+        raise OfflineError("Scattered files can't be downloaded in offline mode.")
+    controller = None
+    if adaptive:
+        # Start at the requested worker count and let the controller find out
+        # how far the server can go.
+        controller = AIMDController(initial=workers, maximum=workers * 4)
+    return ScatteredDownloader(
+        game_info.major.res_list_url,
+        workers=workers,
+        retries=retries,
+        progress=progress,
+        controller=controller,
+    )
+
+
+# Cost model for picking a repair strategy, in "bytes downloaded": every
+# request costs about as much as downloading this many bytes (round trip and
+# server overhead), and extracting a byte costs this fraction of downloading it.
+_REQUEST_COST = 256 * 1024
+_EXTRACT_COST = 0.25
 
 
-def _repair_file(game: GameABC, file: PathLike, game_info: resource.Main) -> None:
-    # .replace("\\", "/") is needed because Windows uses backslashes :)
-    relative_file = file.relative_to(game.path)
-    url = game_info.major.res_list_url + "/" + str(relative_file).replace("\\", "/")
-    # Backup the file
-    if file.exists():
-        backup_file = file.with_suffix(file.suffix + ".bak")
-        if backup_file.exists():
-            backup_file.unlink()
-        file.rename(backup_file)
-        dest_file = file.with_suffix("")
+class RepairEstimate:
+    """
+    Estimated cost of repairing files with each `RepairStrategy`.
+
+    Files which aren't in any package are downloaded as scattered files with
+    both strategies, so they're counted in the archive estimate too.
+    """
+
+    def __init__(
+        self,
+        strategy: RepairStrategy,
+        reason: str,
+        scattered_bytes: int = 0,
+        scattered_requests: int = 0,
+        archive_bytes: int = 0,
+        archive_requests: int = 0,
+        extract_bytes: int = 0,
+    ):
+        self.strategy = strategy
+        self.reason = reason
+        self.scattered_bytes = scattered_bytes
+        self.scattered_requests = scattered_requests
+        self.archive_bytes = archive_bytes
+        self.archive_requests = archive_requests
+        self.extract_bytes = extract_bytes
+
+    @property
+    def scattered_cost(self) -> float:
+        return self.scattered_bytes + self.scattered_requests * _REQUEST_COST
+
+    @property
+    def archive_cost(self) -> float:
+        return (
+            self.archive_bytes
+            + self.archive_requests * _REQUEST_COST
+            + self.extract_bytes * _EXTRACT_COST
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.strategy.name} ({self.reason}; "
+            + f"scattered: {self.scattered_requests} requests, "
+            + f"{self.scattered_bytes / 1000 / 1000:.2f} MB; "
+            + f"archive: {self.archive_requests} requests, "
+            + f"{self.archive_bytes / 1000 / 1000:.2f} MB, "
+            + f"{self.extract_bytes / 1000 / 1000:.2f} MB to extract)"
+        )
+
+
+def _repair_packages(
+    game_info: resource.Main, manifest: Manifest
+) -> dict[str, list[resource.GamePackage | resource.AudioPackage]]:
+    """
+    Gets the package (split in parts) containing the files of each manifest.
+    """
+    major = game_info.major
+    if not major:
+        return {}
+    packages = {}
+    if major.game_pkgs:
+        packages["pkg_version"] = major.game_pkgs
+    for origin in manifest.origins:
+        language = audio_manifest_language(origin)
+        if language is None:
+            continue
+        parts = [x for x in major.audio_pkgs if x.language == language]
+        if parts:
+            packages[origin] = parts
+    return packages
+
+
+def _estimate_repair(
+    game: GameABC,
+    game_info: resource.Main,
+    manifest: Manifest,
+    jobs: list[tuple[str, Path, str | None, int | None]],
+    strategy: RepairStrategy = RepairStrategy.Auto,
+) -> RepairEstimate:
+    packages = _repair_packages(game_info, manifest)
+    estimate = RepairEstimate(strategy, "requested")
+    needed: set[str] = set()
+    for path, _, _, size in jobs:
+        size = size or 0
+        estimate.scattered_bytes += size
+        estimate.scattered_requests += 1
+        origin = manifest.origin(path) if path in manifest else None
+        if origin in packages:
+            needed.add(origin)
+        else:
+            estimate.archive_bytes += size
+            estimate.archive_requests += 1
+    for origin in needed:
+        for part in packages[origin]:
+            estimate.archive_bytes += part.size
+            estimate.archive_requests += 1
+            estimate.extract_bytes += part.decompressed_size
+    if strategy != RepairStrategy.Auto:
+        return estimate
+    if offline.enabled:
+        # Packages may be in the package folder, scattered files never are.
+        estimate.strategy = RepairStrategy.Archive
+        estimate.reason = "offline mode"
+    elif not game_info.major or not game_info.major.res_list_url:
+        estimate.strategy = RepairStrategy.Archive
+        estimate.reason = "scattered files are not available"
+    elif not needed:
+        estimate.strategy = RepairStrategy.Scattered
+        estimate.reason = "no package contains the broken files"
+    elif disk_usage(game.cache).free < estimate.archive_bytes * 2:
+        # The package and the extracted files
+        estimate.strategy = RepairStrategy.Scattered
+        estimate.reason = "not enough free space for the packages"
+    elif estimate.archive_cost < estimate.scattered_cost:
+        estimate.strategy = RepairStrategy.Archive
+        estimate.reason = "fewer bytes and requests"
     else:
-        dest_file = file
-    try:
-        # Download the file
-        temp_file = game.cache.joinpath(relative_file)
-        dest_file.parent.mkdir(parents=True, exist_ok=True)
-        print(f"Downloading repair file {url} to {temp_file}")
-        download(url, temp_file, overwrite=True, stream=True)
-        # Move the file
-        move(temp_file, dest_file)
-        print("OK")
-    except Exception as e:
-        # Restore the backup
-        print("Failed", e)
-        if file.exists():
-            file.rename(file.with_suffix(""))
-        raise e
-    # Delete the backup
-    if file.exists():
-        file.unlink(missing_ok=True)
+        estimate.strategy = RepairStrategy.Scattered
+        estimate.reason = "fewer bytes and requests"
+    return estimate
+
+
+def download_package(
+    game: GameABC, package: resource.GamePackage | resource.AudioPackage
+) -> Path:
+    """
+    Downloads a game or voicepack package to the game cache and verifies it.
+
+    A package which is already in the cache with the right size isn't
+    downloaded again, and a partially downloaded one is resumed.
+
+    Args:
+        game (GameABC): The game.
+        package (GamePackage | AudioPackage): The package.
+
+    Returns:
+        Path: The package file.
+    """
+    archive_file = game.cache.joinpath(PurePath(package.url).name)
+    if not archive_file.is_file() or archive_file.stat().st_size != package.size:
+        download(package.url, archive_file, file_len=package.size)
+    if not verify_package(archive_file, package.md5):
+        archive_file.unlink(missing_ok=True)
+        raise ChecksumMismatchError(f"Checksum mismatch for {archive_file.name}.")
+    return archive_file
+
+
+def _repair_from_archive(
+    game: GameABC,
+    archive_file: Path,
+    jobs: dict[str, tuple[Path, str | None, int | None]],
+) -> list[str]:
+    """
+    Extracts the broken files from an archive and moves the verified ones into
+    the game folder.
+
+    Returns:
+        list[str]: The repaired files.
+    """
+    staging_path = game.cache.joinpath("repair", archive_file.name)
+    with _open_package(archive_file) as archive:
+        names = set(archive.namelist())
+        targets = [x for x in jobs if x in names]
+        if targets:
+            _extract_files(archive, targets, staging_path)
+    repaired: list[str] = []
+    for name in targets:
+        file = staging_path.joinpath(name)
+        dest, md5, _ = jobs[name]
+        if md5 and not verify_package(file, md5):
+            print(f"Failed to repair {name}: checksum mismatch in {archive_file.name}")
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        _move_file(file, dest)
+        if md5:
+            game.hash_index.set(name, dest.stat(), md5)
+        else:
+            game.hash_index.remove([name])
+        repaired.append(name)
+    game.hash_index.commit()
+    rmtree(staging_path, ignore_errors=True)
+    return repaired
+
+
+def _repair_with_archives(
+    game: GameABC,
+    game_info: resource.Main,
+    manifest: Manifest,
+    jobs: list[tuple[str, Path, str | None, int | None]],
+    keep_packages: bool = False,
+) -> tuple[DownloadStats, list[tuple[str, Path, str | None, int | None]]]:
+    """
+    Repairs files from their packages.
+
+    The packages downloaded here are deleted once the files are extracted,
+    unless `keep_packages` is set. Packages which were already in the cache
+    are always kept.
+
+    Returns:
+        tuple[DownloadStats, list[tuple[str, Path, str | None, int | None]]]:
+            The download statistics and the files which weren't repaired.
+    """
+    stats = DownloadStats()
+    start = monotonic()
+    remaining = {path: (dest, md5, size) for path, dest, md5, size in jobs}
+    for origin, parts in _repair_packages(game_info, manifest).items():
+        package_jobs = {
+            path: job
+            for path, job in remaining.items()
+            if path in manifest and manifest.origin(path) == origin
+        }
+        if not package_jobs:
+            continue
+        downloaded: list[Path] = []
+        for part in parts:
+            part_file = game.cache.joinpath(PurePath(part.url).name)
+            if not part_file.is_file() or part_file.stat().st_size != part.size:
+                downloaded.append(part_file)
+            download_package(game, part)
+            stats.bytes += part.size
+        # Split packages are opened from their first part.
+        archive_file = game.cache.joinpath(PurePath(parts[0].url).name)
+        try:
+            for path in _repair_from_archive(game, archive_file, package_jobs):
+                stats.files += 1
+                remaining.pop(path)
+        finally:
+            if not keep_packages:
+                for part_file in downloaded:
+                    part_file.unlink(missing_ok=True)
+    stats.elapsed = monotonic() - start
+    return stats, [(path, *job) for path, job in remaining.items()]
+
+
+def _find_cached_packages(game: GameABC, game_info: resource.Main) -> list[Path]:
+    """
+    Finds the packages of the installed version which are still in the cache.
+
+    The packages aren't hashed, only their size is checked: the files extracted
+    from them are verified against the manifest instead.
+
+    Returns:
+        list[Path]: The packages (the first part for split packages).
+    """
+    major = game_info.major
+    if not major or major.version != ".".join(str(x) for x in game.get_version()):
+        return []
+    # The full packages and the updates to this version both contain files of
+    # this version, every extracted file is verified anyway.
+    groups = [major.game_pkgs] + [[x] for x in major.audio_pkgs]
+    for patch in game_info.patches:
+        groups.append(patch.game_pkgs)
+        groups.extend([x] for x in patch.audio_pkgs)
+    archives = []
+    for parts in groups:
+        if not parts:
+            continue
+        for part in parts:
+            file = game.cache.joinpath(PurePath(part.url).name)
+            try:
+                if file.stat().st_size != part.size:
+                    break
+            except OSError:
+                break
+        else:
+            archives.append(game.cache.joinpath(PurePath(parts[0].url).name))
+    return archives
+
+
+def _repair_from_cache(
+    game: GameABC,
+    game_info: resource.Main,
+    jobs: list[tuple[str, Path, str | None, int | None]],
+) -> tuple[int, list[tuple[str, Path, str | None, int | None]]]:
+    """
+    Repairs files from the packages in the cache.
+
+    Only the packages listing some of the broken files are extracted from.
+
+    Returns:
+        tuple[int, list[tuple[str, Path, str | None, int | None]]]: How many
+            files were repaired and the files which weren't.
+    """
+    # Files without a known checksum can't be verified, so they're left to the
+    # other strategies.
+    remaining = {path: (dest, md5, size) for path, dest, md5, size in jobs if md5}
+    repaired = 0
+    for archive_file in _find_cached_packages(game, game_info):
+        if not remaining:
+            break
+        try:
+            repaired_files = _repair_from_archive(game, archive_file, remaining)
+        except Exception as e:
+            # A broken package, the files are repaired another way.
+            print(f"Failed to read {archive_file.name}: {e}")
+            continue
+        for path in repaired_files:
+            remaining.pop(path)
+            repaired += 1
+    return repaired, [job for job in jobs if job[0] in remaining or job[2] is None]
 
 
 def repair_files(
@@ -275,18 +842,44 @@ def repair_files(
     files: list[PathLike],
     pre_download: bool = False,
     game_info: resource.Game = None,
-) -> None:
+    workers: int = 8,
+    retries: int = 3,
+    progress: Callable[[DownloadResult, DownloadStats], None] = None,
+    adaptive: bool = True,
+    strategy: RepairStrategy = RepairStrategy.Auto,
+    use_cache: bool = True,
+    keep_packages: bool = False,
+) -> DownloadStats:
     """
     Repairs multiple game files.
 
-    This will automatically handle backup and restore the file if the repair
-    fails.
+    The files are first extracted from the packages of the installed version
+    which are still in the cache, the remaining ones are either downloaded in
+    parallel from the server, or extracted from the game packages if that's
+    cheaper (see `RepairStrategy`). They're verified against the manifest and
+    then replaced atomically, so the old file is kept if the repair fails.
 
     Args:
         game (GameABC): The game to repair the files for.
         files (PathLike): The files to repair.
         pre_download (bool): Whether to get the pre-download version.
             Defaults to False.
+        workers (int): How many files to download at once. Defaults to 8.
+        retries (int): How many times to retry a failed download. Defaults to 3.
+        progress (Callable[[DownloadResult, DownloadStats], None], optional):
+            Called after each file is downloaded.
+        adaptive (bool): Whether to adjust the number of concurrent downloads
+            (between 1 and 4 times `workers`) to the server's response.
+            Defaults to True.
+        strategy (RepairStrategy): How to download the files. Defaults to
+            `RepairStrategy.Auto`.
+        use_cache (bool): Whether to repair the files from the cached packages
+            first. Defaults to True.
+        keep_packages (bool): Whether to keep the packages downloaded to
+            repair the files in the cache. Defaults to False.
+
+    Returns:
+        DownloadStats: The download statistics.
     """
     if not game.is_installed():
         raise GameNotInstalledError("Game is not installed.")
@@ -296,23 +889,794 @@ def repair_files(
             raise ValueError("File is not in the game folder.")
     if not game_info:
         game_info = game.get_remote_game(pre_download=pre_download)
-    if game_info.latest.decompressed_path is None:
-        raise ScatteredFilesNotAvailableError("Scattered files are not available.")
-    executor = concurrent.futures.ThreadPoolExecutor()
-    for file in files_path:
-        executor.submit(_repair_file, file, game=game_info)
-        # self._repair_file(file, game=game)
-    executor.shutdown(wait=True)
+    manifest = _load_manifest(game)
+    jobs = list(_repair_jobs(game, files_path, manifest))
+    stats = DownloadStats()
+    if use_cache:
+        repaired, jobs = _repair_from_cache(game, game_info, jobs)
+        if repaired:
+            print(f"Repaired {repaired} files from the cached packages")
+            stats.files += repaired
+        if not jobs:
+            return stats
+    estimate = _estimate_repair(game, game_info, manifest, jobs, strategy)
+    print(f"Repair strategy: {estimate}")
+    if estimate.strategy == RepairStrategy.Archive:
+        archive_stats, jobs = _repair_with_archives(
+            game, game_info, manifest, jobs, keep_packages=keep_packages
+        )
+        stats.files += archive_stats.files
+        stats.bytes += archive_stats.bytes
+        stats.elapsed += archive_stats.elapsed
+        if not jobs:
+            return stats
+    downloader = _get_downloader(game, game_info, workers, retries, progress, adaptive)
+    try:
+        _repair_with(game, downloader, jobs)
+    finally:
+        stats.files += downloader.stats.files
+        stats.failed += downloader.stats.failed
+        stats.bytes += downloader.stats.bytes
+        stats.elapsed += downloader.stats.elapsed
+    return stats
+
+
+def _scan_files(
+    game: GameABC, files: Iterable[str]
+) -> Iterator[tuple[str, os.stat_result | None]]:
+    """
+    Gets the stat of the files listed in a manifest.
+
+    Every folder is listed once with `os.scandir()` instead of walking the
+    whole game folder.
+
+    Returns:
+        Iterator[tuple[str, os.stat_result | None]]: The file paths and their
+            stat, or `None` if the file doesn't exist.
+    """
+    directories: dict[str, list[str]] = {}
+    for file in files:
+        directory, _, name = file.rpartition("/")
+        directories.setdefault(directory, []).append(name)
+    for directory, names in directories.items():
+        directory_path = game.path.joinpath(directory)
+        try:
+            with os.scandir(directory_path) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            entries = {}
+        for name in names:
+            relative_path_str = f"{directory}/{name}" if directory else name
+            entry = entries.get(name)
+            try:
+                if entry is not None:
+                    if entry.is_file():
+                        yield relative_path_str, entry.stat()
+                        continue
+                elif entries:
+                    # Case-insensitive filesystems may list the file with another case
+                    stat = directory_path.joinpath(name).stat()
+                    if S_ISREG(stat.st_mode):
+                        yield relative_path_str, stat
+                        continue
+            except OSError:
+                pass
+            yield relative_path_str, None
+
+
+def _find_extra_files(game: GameABC, files: Iterable[str]) -> Iterator[Path]:
+    """
+    Finds the files in the game folder which aren't listed in a manifest.
+    """
+    known_files = set(files)
+    for root, dirs, filenames in os.walk(game.path):
+        # Ignore webCaches folder (because it's user data)
+        if "webCaches" in dirs:
+            dirs.remove("webCaches")
+        root_path = Path(root)
+        for filename in filenames:
+            file = root_path.joinpath(filename)
+            if _relative_path(game, file) not in known_files:
+                yield file
+
+
+def _is_excluded(name: str, relative_path: str, exclude: list[str]) -> bool:
+    return any(
+        fnmatch(name, pattern) or fnmatch(relative_path, pattern) for pattern in exclude
+    )
+
+
+def find_orphan_files(
+    game: GameABC, exclude: list[str] | None = None
+) -> list[tuple[Path, int]]:
+    """
+    Finds the files in the game folder which aren't in any manifest, like
+    leftovers of interrupted updates and assets removed by updates.
+
+    The manifests of every voicepack with an "Audio_*_pkg_version" file are
+    used, whether the voicepack is installed or not.
+
+    Args:
+        game (GameABC): The game.
+        exclude (list[str], optional): Glob patterns of the files and folders
+            to keep, defaults to `ORPHAN_EXCLUDE` (user data, the game's own
+            downloads and the manifests).
+
+    Returns:
+        list[tuple[Path, int]]: The orphan files and their sizes, biggest first.
+    """
+    if not game.is_installed():
+        raise GameNotInstalledError("Game is not installed.")
+    if not game.path.joinpath("pkg_version").is_file():
+        raise RepairError(
+            "pkg_version file not found, can't tell which files are orphans."
+        )
+    if exclude is None:
+        exclude = ORPHAN_EXCLUDE
+    manifest = Manifest.from_game(game, voicepacks=list(VoicePackLanguage))
+    orphans: list[tuple[Path, int]] = []
+    for root, dirs, filenames in os.walk(game.path):
+        root_path = Path(root)
+        relative_root = _relative_path(game, root_path)
+        prefix = "" if relative_root == "." else relative_root + "/"
+        dirs[:] = [x for x in dirs if not _is_excluded(x, prefix + x, exclude)]
+        for filename in filenames:
+            relative_path_str = prefix + filename
+            if relative_path_str in manifest:
+                continue
+            if _is_excluded(filename, relative_path_str, exclude):
+                continue
+            file = root_path.joinpath(filename)
+            try:
+                orphans.append((file, file.stat().st_size))
+            except OSError:
+                continue
+    orphans.sort(key=lambda x: x[1], reverse=True)
+    return orphans
+
+
+class ReclaimResult:
+    """
+    The result of `reclaim_orphan_files()`.
+    """
+
+    def __init__(self, trash_path: Path | None = None):
+        self.files = 0
+        self.bytes = 0
+        self.failed: list[tuple[Path, Exception]] = []
+        self.trash_path = trash_path
+
+    def __str__(self) -> str:
+        action = "Deleted" if self.trash_path is None else "Moved to trash"
+        return (
+            f"{action} {self.files} files ({self.bytes / 1000 / 1000:.2f} MB), "
+            + f"{len(self.failed)} failed"
+        )
+
+
+def reclaim_orphan_files(
+    game: GameABC,
+    files: list[tuple[Path, int]] | None = None,
+    delete: bool = False,
+    workers: int = 8,
+) -> ReclaimResult:
+    """
+    Removes orphan files from the game folder.
+
+    By default they're moved to a trash folder in the cache (which you can
+    delete after checking the game still works), patchers may keep backups in
+    the game folder which look like orphans.
+
+    Args:
+        game (GameABC): The game.
+        files (list[tuple[Path, int]], optional): The files to remove and their
+            sizes, defaults to `find_orphan_files()`.
+        delete (bool): Whether to delete the files instead. Defaults to False.
+        workers (int): How many files to remove at once. Defaults to 8.
+
+    Returns:
+        ReclaimResult: The number of files and bytes reclaimed.
+    """
+    if files is None:
+        files = find_orphan_files(game)
+    trash_path = None
+    if not delete:
+        trash_path = game.cache.joinpath(
+            "trash", datetime.now().strftime("%Y%m%d-%H%M%S")
+        )
+    result = ReclaimResult(trash_path)
+
+    def remove(file: Path):
+        if trash_path is None:
+            file.unlink()
+            return
+        target = trash_path.joinpath(file.relative_to(game.path))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _move_file(file, target)
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        futures = {executor.submit(remove, file): (file, size) for file, size in files}
+        for future in concurrent.futures.as_completed(futures):
+            file, size = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                result.failed.append((file, e))
+            else:
+                result.files += 1
+                result.bytes += size
+    _forget_files(game, [_relative_path(game, file) for file, _ in files])
+    # Remove the folders which are empty now, deepest first.
+    folders = {file.parent for file, _ in files}
+    for folder in sorted(folders, key=lambda x: len(x.parts), reverse=True):
+        while folder != game.path and folder.is_relative_to(game.path):
+            try:
+                folder.rmdir()
+            except OSError:
+                break
+            folder = folder.parent
+    return result
+
+
+class VoicepackInfo:
+    """
+    Size and completeness of an installed voicepack, see
+    `get_voicepack_inventory()`.
+
+    `files` and `size` come from the voicepack manifest, `installed_files` and
+    `installed_size` count the files which are in the game folder with the
+    right size. They're `None` if the voicepack has no manifest.
+    """
+
+    def __init__(
+        self,
+        language: VoicePackLanguage,
+        folder: Path | None = None,
+        manifest: Path | None = None,
+    ):
+        self.language = language
+        self.folder = folder
+        self.manifest = manifest
+        self.files: int | None = None
+        self.size: int | None = None
+        self.installed_files: int | None = None
+        self.installed_size: int | None = None
+        self.missing: list[str] = []
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether every file in the manifest is installed.
+        """
+        return self.manifest is not None and not self.missing
+
+    def get_files(self) -> list[str]:
+        """
+        Gets the files of the voicepack from its manifest.
+
+        Returns:
+            list[str]: The file paths relative to the game folder.
+        """
+        if self.manifest is None:
+            return []
+        return list(Manifest.from_file(self.manifest))
+
+    def to_dict(self) -> dict:
+        return {
+            "folder": str(self.folder) if self.folder else None,
+            "manifest": str(self.manifest) if self.manifest else None,
+            "files": self.files,
+            "size": self.size,
+            "installed_files": self.installed_files,
+            "installed_size": self.installed_size,
+            "missing": self.missing,
+        }
+
+    @staticmethod
+    def from_dict(language: VoicePackLanguage, data: dict) -> "VoicepackInfo":
+        info = VoicepackInfo(
+            language,
+            Path(data["folder"]) if data["folder"] else None,
+            Path(data["manifest"]) if data["manifest"] else None,
+        )
+        info.files = data["files"]
+        info.size = data["size"]
+        info.installed_files = data["installed_files"]
+        info.installed_size = data["installed_size"]
+        info.missing = data["missing"]
+        return info
+
+    def __str__(self) -> str:
+        if self.manifest is None:
+            return f"{self.language.name}: no manifest"
+        status = "complete" if self.complete else f"{len(self.missing)} files missing"
+        return (
+            f"{self.language.name}: {self.installed_files}/{self.files} files, "
+            + f"{self.installed_size / 1000 / 1000:.2f}/{self.size / 1000 / 1000:.2f} MB "
+            + f"({status})"
+        )
+
+
+def _stat_signature(path: Path | None) -> list | None:
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _inventory_voicepack(game: GameABC, info: VoicepackInfo) -> None:
+    info.files = info.size = info.installed_files = info.installed_size = 0
+    info.missing = []
+    # Only the sizes are checked, nothing is read.
+    for entry in Manifest.from_file(info.manifest).entries():
+        info.files += 1
+        info.size += entry.size
+        try:
+            installed = game.path.joinpath(entry.path).stat().st_size == entry.size
+        except OSError:
+            installed = False
+        if installed:
+            info.installed_files += 1
+            info.installed_size += entry.size
+        else:
+            info.missing.append(entry.path)
+
+
+def get_voicepack_inventory(
+    game: GameABC, refresh: bool = False
+) -> dict[VoicePackLanguage, VoicepackInfo]:
+    """
+    Gets the file count, size and completeness of each installed voicepack.
+
+    The voicepacks are found from their "Audio_*_pkg_version" manifests and
+    audio folders. The inventory is saved next to the hash index and only
+    rebuilt for a voicepack when its manifest or its audio folder changes,
+    rebuilding only checks the file sizes so no audio is read.
+
+    Args:
+        game (GameABC): The game.
+        refresh (bool): Whether to rebuild the whole inventory, e.g. if files
+            were changed in place. Defaults to False.
+
+    Returns:
+        dict[VoicePackLanguage, VoicepackInfo]: The inventory of each voicepack.
+    """
+    if not game.is_installed():
+        raise GameNotInstalledError("Game is not installed.")
+    inventory_file = game.hash_index.path.with_suffix(".voicepacks.json")
+    try:
+        saved = json.loads(inventory_file.read_text())
+    except (OSError, ValueError):
+        saved = {}
+    folders = game.get_voicepack_folders()
+    manifests = get_audio_manifests(game.path)
+    inventory: dict[VoicePackLanguage, VoicepackInfo] = {}
+    changed = False
+    for language in [*folders, *[x for x in manifests if x not in folders]]:
+        folder = folders.get(language)
+        manifest = manifests.get(language)
+        signature = [_stat_signature(manifest), _stat_signature(folder)]
+        entry = saved.get(language.name)
+        if not refresh and entry and entry["signature"] == signature:
+            info = VoicepackInfo.from_dict(language, entry["info"])
+            if info.folder == folder and info.manifest == manifest:
+                inventory[language] = info
+                continue
+        info = VoicepackInfo(language, folder, manifest)
+        if manifest is not None:
+            _inventory_voicepack(game, info)
+        inventory[language] = info
+        saved[language.name] = {"signature": signature, "info": info.to_dict()}
+        changed = True
+    for name in [x for x in saved if x not in [y.name for y in inventory]]:
+        del saved[name]
+        changed = True
+    if changed:
+        inventory_file.parent.mkdir(parents=True, exist_ok=True)
+        inventory_file.write_text(json.dumps(saved))
+    return inventory
+
+
+class VerifyResult:
+    """
+    The verification result of a game file.
+
+    `expected_md5` and `expected_size` are `None` for files which aren't in
+    the manifest.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        status: FileStatus,
+        expected_md5: str | None = None,
+        expected_size: int | None = None,
+        md5: str | None = None,
+        size: int | None = None,
+    ):
+        self.path = path
+        self.status = status
+        self.expected_md5 = expected_md5
+        self.expected_size = expected_size
+        self.md5 = md5
+        self.size = size
+
+    def __str__(self) -> str:
+        match self.status:
+            case FileStatus.Missing:
+                return f"{self.path} not found."
+            case FileStatus.SizeMismatch:
+                return f"Size mismatch for {self.path} ({self.size}; expected {self.expected_size})"
+            case FileStatus.HashMismatch:
+                return f"Hash mismatch for {self.path} ({self.md5}; expected {self.expected_md5})"
+            case FileStatus.Unreadable:
+                return f"File '{self.path}' is corrupted."
+            case _:
+                return f"{self.path} is OK."
+
+
+def _get_repair_manifest(
+    game: GameABC,
+    game_info: resource.Main | None,
+    voicepacks: list[VoicePackLanguage] | None = None,
+) -> tuple[Manifest, Manifest]:
+    """
+    Gets the manifest to verify and the full manifest of the installation.
+    """
+    pkg_version_file = game.path.joinpath("pkg_version")
+    if not pkg_version_file.is_file():
+        try:
+            if not game_info:
+                game_info = game.get_remote_game()
+            game.repair_file(pkg_version_file, game_info=game_info)
+        except Exception as e:
+            raise RepairError(
+                "pkg_version file not found, most likely you need to download the full game again."
+            ) from e
+    full_manifest = Manifest.from_game(game)
+    if voicepacks is None:
+        return full_manifest, full_manifest
+    audio_manifests = get_audio_manifests(game.path)
+    manifests = []
+    for voicepack in voicepacks:
+        if voicepack not in audio_manifests:
+            raise RepairError(f"Manifest for voicepack {voicepack.name} not found.")
+        manifests.append(Manifest.from_file(audio_manifests[voicepack]))
+    return Manifest.merge(*manifests), full_manifest
+
+
+def verify_game(
+    game: GameABC,
+    level: VerifyLevel = VerifyLevel.Standard,
+    hasher: Hasher = None,
+    check_extra_files: bool = False,
+    voicepacks: list[VoicePackLanguage] | None = None,
+    game_info: resource.Main = None,
+    files: Iterable[str] | None = None,
+) -> Iterator[VerifyResult]:
+    """
+    Verifies the game files against "pkg_version" and the installed voicepacks'
+    manifests, yielding each result as soon as it's available.
+
+    Files are first checked against the size in the manifest, then depending
+    on `level` they're hashed too. With `VerifyLevel.Standard` the files whose
+    size, modification time and inode haven't changed since they were last
+    verified are not hashed again.
+
+    `hasher` can be used to tune the hashing engine for the storage the game
+    is installed on, see `Hasher` for more info.
+
+    Only the files listed in the manifests are checked, unless `check_extra_files`
+    is set, then the other files in the game folder are checked if they're
+    readable too.
+
+    If `voicepacks` is specified then only the files of these voicepacks are
+    verified, and if `files` (paths relative to the game folder) is specified
+    then only these files are verified, files which aren't in the manifests
+    are ignored.
+
+    Because this function is shared for all games, you should use the game's
+    `verify_game()` method instead, which additionally applies required
+    methods for that game.
+
+    Returns:
+        Iterator[VerifyResult]: The verification results.
+    """
+    if not game.is_installed():
+        raise GameNotInstalledError("Game is not installed.")
+    manifest, full_manifest = _get_repair_manifest(game, game_info, voicepacks)
+    if hasher is None:
+        hasher = Hasher()
+    if files is not None:
+        files = [x for x in files if x in manifest]
+    else:
+        files = manifest
+    # The files to hash are handed to a hashing thread, so the scan results
+    # can be yielded right away instead of waiting behind the hashing.
+    hash_queue: queue.Queue = queue.Queue()
+    results_queue: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    def queued_files():
+        while (item := hash_queue.get()) is not None and not stop.is_set():
+            yield item
+
+    def hash_queued_files():
+        try:
+            for result in hasher.hash_files(queued_files()):
+                results_queue.put(result)
+        except Exception as e:
+            results_queue.put(e)
+        results_queue.put(None)
+
+    def hash_result(result) -> VerifyResult:
+        if isinstance(result, Exception):
+            raise result
+        relative_path_str, stat, md5 = result.key
+        if result.md5 == md5:
+            game.hash_index.set(relative_path_str, stat, result.md5)
+            status = FileStatus.OK
+        elif result.error:
+            status = FileStatus.Unreadable
+        else:
+            status = FileStatus.HashMismatch
+        return VerifyResult(
+            result.path,
+            status,
+            md5,
+            stat.st_size,
+            md5=result.md5,
+            size=stat.st_size,
+        )
+
+    hash_thread = threading.Thread(target=hash_queued_files, daemon=True)
+    hash_thread.start()
+    try:
+        for relative_path_str, stat in _scan_files(game, files):
+            target_file = manifest[relative_path_str]
+            file = game.path.joinpath(relative_path_str)
+            if stat is None:
+                yield VerifyResult(
+                    file, FileStatus.Missing, target_file.md5, target_file.size
+                )
+            elif stat.st_size != target_file.size:
+                yield VerifyResult(
+                    file,
+                    FileStatus.SizeMismatch,
+                    target_file.md5,
+                    target_file.size,
+                    size=stat.st_size,
+                )
+            elif level == VerifyLevel.Quick or (
+                level == VerifyLevel.Standard
+                and game.hash_index.get(relative_path_str, stat) == target_file.md5
+            ):
+                yield VerifyResult(
+                    file,
+                    FileStatus.OK,
+                    target_file.md5,
+                    target_file.size,
+                    size=stat.st_size,
+                )
+            else:
+                hash_queue.put(
+                    ((relative_path_str, stat, target_file.md5), file, stat.st_size)
+                )
+            # Yield the files hashed meanwhile without waiting for the others.
+            while True:
+                try:
+                    result = results_queue.get_nowait()
+                except queue.Empty:
+                    break
+                yield hash_result(result)
+        hash_queue.put(None)
+        while (result := results_queue.get()) is not None:
+            yield hash_result(result)
+    finally:
+        # Stops the hashing if the caller stopped early.
+        stop.set()
+        hash_queue.put(None)
+        hash_thread.join()
+        game.hash_index.commit()
+    if check_extra_files:
+        for file in _find_extra_files(game, full_manifest):
+            try:
+                with file.open("rb", buffering=0) as f:
+                    # We only need to read 4 bytes to see if the file is readable or not
+                    f.read(4)
+            except Exception:
+                yield VerifyResult(file, FileStatus.Unreadable)
+            else:
+                yield VerifyResult(file, FileStatus.OK)
+
+
+class QuickCheckResult:
+    """
+    The result of `quick_check()`.
+
+    `confidence` is the probability that less than `tolerance` of the files
+    which passed the size check are corrupted, given that every sampled file
+    was OK (it's 0 if a sampled file was broken). The sample is weighted, so
+    it's computed for the worst case: the corrupted files being the ones
+    least likely to be sampled, which one sampled file hits with a probability
+    of `detection`.
+
+    `escalate` are the files worth verifying fully: the broken files and the
+    files most likely to be sampled which changed (or were never verified)
+    since they were last hashed.
+    """
+
+    def __init__(
+        self,
+        checked: int,
+        broken: list[VerifyResult],
+        sampled: list[VerifyResult],
+        escalate: list[Path],
+        tolerance: float,
+        detection: float,
+    ):
+        self.checked = checked
+        self.broken = broken
+        self.sampled = sampled
+        self.escalate = escalate
+        self.tolerance = tolerance
+        self.detection = detection
+
+    @property
+    def confidence(self) -> float:
+        if any(x.status != FileStatus.OK for x in self.sampled):
+            return 0.0
+        return 1 - (1 - self.detection) ** len(self.sampled)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.checked} files checked, {len(self.broken)} broken, "
+            + f"{len(self.sampled)} hashed; {self.confidence * 100:.1f}% confident "
+            + f"less than {self.tolerance * 100:g}% of the files are corrupted, "
+            + f"{len(self.escalate)} files worth verifying fully"
+        )
+
+
+def _sample_weight(stat: os.stat_result, now: float) -> float:
+    # Recently written files are the most likely to be broken (interrupted
+    # updates, crashes), and bigger files have more bytes to go bad. Size is
+    # only counted logarithmically, so the check stays quick.
+    age_days = max(now - stat.st_mtime, 0) / (24 * 60 * 60)
+    return math.log2(stat.st_size + 2) * (1 + 7 / (1 + age_days))
+
+
+def quick_check(
+    game: GameABC,
+    sample_size: int = 128,
+    tolerance: float = 0.02,
+    hasher: Hasher = None,
+    voicepacks: list[VoicePackLanguage] | None = None,
+    game_info: resource.Main = None,
+    seed: int | None = None,
+) -> QuickCheckResult:
+    """
+    Quickly estimates the health of the game installation.
+
+    Every file in the manifests is checked for presence and size, then a random
+    sample of the files is hashed. The sample is weighted towards recently
+    modified and bigger files. At most `sample_size` files which weren't
+    verified yet are listed to verify fully, besides the broken ones.
+
+    Args:
+        game (GameABC): The game to check.
+        sample_size (int): How many files to hash. Defaults to 128.
+        tolerance (float): The fraction of corrupted files the confidence is
+            computed for. Defaults to 0.02.
+        hasher (Hasher, optional): The hashing engine to use.
+        voicepacks (list[VoicePackLanguage], optional): Only check the files of
+            these voicepacks.
+        seed (int, optional): Seed for the random sample.
+
+    Returns:
+        QuickCheckResult: The check result.
+    """
+    if not game.is_installed():
+        raise GameNotInstalledError("Game is not installed.")
+    manifest, _ = _get_repair_manifest(game, game_info, voicepacks)
+    if hasher is None:
+        hasher = Hasher()
+    rng = random.Random(seed)
+    now = time()
+    broken: list[VerifyResult] = []
+    # The files which weren't verified since they last changed, and their weight.
+    unverified: list[tuple[float, str]] = []
+    weights: list[float] = []
+    # Weighted sampling without replacement (Efraimidis-Spirakis), so the
+    # sample is picked in a single pass.
+    keyed: list[tuple[float, str, os.stat_result]] = []
+    checked = 0
+    for relative_path_str, stat in _scan_files(game, manifest):
+        checked += 1
+        file = game.path.joinpath(relative_path_str)
+        target_file = manifest[relative_path_str]
+        if stat is None:
+            broken.append(
+                VerifyResult(
+                    file, FileStatus.Missing, target_file.md5, target_file.size
+                )
+            )
+        elif stat.st_size != target_file.size:
+            broken.append(
+                VerifyResult(
+                    file,
+                    FileStatus.SizeMismatch,
+                    target_file.md5,
+                    target_file.size,
+                    size=stat.st_size,
+                )
+            )
+        else:
+            weight = _sample_weight(stat, now)
+            if game.hash_index.get(relative_path_str, stat) != target_file.md5:
+                unverified.append((weight, relative_path_str))
+            weights.append(weight)
+            keyed.append((rng.random() ** (1 / weight), relative_path_str, stat))
+    sample = heapq.nlargest(sample_size, keyed, key=lambda x: x[0])
+    sampled: list[VerifyResult] = []
+    jobs = ((x[1:], game.path.joinpath(x[1]), x[2].st_size) for x in sample)
+    try:
+        for result in hasher.hash_files(jobs):
+            relative_path_str, stat = result.key
+            md5 = manifest.md5(relative_path_str)
+            if result.md5 == md5:
+                game.hash_index.set(relative_path_str, stat, md5)
+                status = FileStatus.OK
+            elif result.error:
+                status = FileStatus.Unreadable
+            else:
+                status = FileStatus.HashMismatch
+            verify_result = VerifyResult(
+                result.path, status, md5, stat.st_size, result.md5, stat.st_size
+            )
+            sampled.append(verify_result)
+            if status != FileStatus.OK:
+                broken.append(verify_result)
+    finally:
+        game.hash_index.commit()
+    # The chance for a sampled file to be corrupted, if `tolerance` of the
+    # files are and they're the ones with the lowest weights.
+    detection = 0.0
+    if weights:
+        corrupted = max(math.ceil(tolerance * len(weights)), 1)
+        detection = sum(heapq.nsmallest(corrupted, weights)) / sum(weights)
+    sampled_paths = {x.path for x in sampled}
+    escalate = [x.path for x in broken]
+    for _, relative_path_str in heapq.nlargest(sample_size, unverified):
+        file = game.path.joinpath(relative_path_str)
+        if file not in sampled_paths:
+            escalate.append(file)
+    return QuickCheckResult(checked, broken, sampled, escalate, tolerance, detection)
 
 
 def repair_game(
     game: GameABC,
     pre_download: bool = False,
+    level: VerifyLevel = VerifyLevel.Standard,
+    hasher: Hasher = None,
+    check_extra_files: bool = False,
+    voicepacks: list[VoicePackLanguage] | None = None,
+    streaming: bool = False,
+    strategy: RepairStrategy = RepairStrategy.Auto,
+    keep_packages: bool = False,
+    progress: Callable[[DownloadResult, DownloadStats], None] = None,
 ) -> None:
     """
     Tries to repair the game by reading "pkg_version" file and downloading the
     mismatched files from the server.
 
+    See `verify_game()` for the verification options. If `streaming` is set,
+    broken files are downloaded as soon as they're found instead of after
+    every file has been verified, which is only possible with scattered files.
+    See `repair_files()` for `strategy`, `keep_packages` and `progress`.
+
     Because this function is shared for all games, you should use the game's
     `repair_game()` method instead, which additionally applies required
     methods for that game.
@@ -320,78 +1684,254 @@ def repair_game(
     # Most code here are copied from worthless-launcher.
     # worthless-launcher uses asyncio for multithreading while this one uses
     # ThreadPoolExecutor, probably better for this use case.
-    if not game.is_installed():
-        raise GameNotInstalledError("Game is not installed.")
+    if streaming and strategy == RepairStrategy.Archive:
+        raise ValueError("Streaming repair only supports scattered files.")
     game_info = game.get_remote_game(pre_download=pre_download)
-    pkg_version_file = game.path.joinpath("pkg_version")
-    pkg_version: dict[str, dict[str, str]] = {}
-    if not pkg_version_file.is_file():
-        try:
-            game.repair_file(game.path.joinpath("pkg_version"), game_info=game_info)
-        except Exception as e:
-            raise RepairError(
-                "pkg_version file not found, most likely you need to download the full game again."
-            ) from e
-    with pkg_version_file.open("r") as f:
-        for line in f.readlines():
-            line = line.strip()
-            if not line:
+    results = verify_game(
+        game,
+        level=level,
+        hasher=hasher,
+        check_extra_files=check_extra_files,
+        voicepacks=voicepacks,
+        game_info=game_info,
+    )
+
+    def broken_files():
+        for result in results:
+            if result.status == FileStatus.OK:
                 continue
-            line_json = json.loads(line)
-            pkg_version[line_json["remoteName"]] = {
-                "md5": line_json["md5"],
-                "fileSize": line_json["fileSize"],
-            }
-    read_needed_files: list[Path] = []
-    target_files: list[Path] = []
-    repair_executor = concurrent.futures.ThreadPoolExecutor()
-    for file in game.path.rglob("*"):
-        # Ignore webCaches folder (because it's user data)
-        if file.is_dir():
-            continue
-        if "webCaches" in str(file):
+            print(result)
+            yield result.path
+
+    if streaming:
+        # The downloader consumes the verification results lazily, so files are
+        # downloaded while the next ones are being verified.
+        downloader = _get_downloader(game, game_info, progress=progress)
+        stats = _repair_with(
+            game, downloader, _repair_jobs(game, broken_files(), _load_manifest(game))
+        )
+        print(f"Concurrency: {downloader.controller}")
+    else:
+        target_files = list(broken_files())
+        if not target_files:
+            return
+        print("Begin repairing files...")
+        stats = game.repair_files(
+            target_files,
+            game_info=game_info,
+            strategy=strategy,
+            keep_packages=keep_packages,
+            progress=progress,
+        )
+    print(f"Downloaded {stats}")
+
+
+def _channel_names(manifest: Manifest) -> tuple[str | None, str | None]:
+    # The executable and data folder names, e.g. "YuanShen.exe" and
+    # "YuanShen_Data" for Genshin on the China channel.
+    for path in manifest:
+        name, _, rest = path.partition("/")
+        if rest and name.endswith("_Data"):
+            exe = name[: -len("_Data")] + ".exe"
+            return (exe if exe in manifest else None), name
+    return None, None
+
+
+def _download_manifests(
+    game: GameABC, downloader: ScatteredDownloader, path: Path
+) -> tuple[Manifest, list[str]]:
+    # The target manifest, with the voicepacks installed locally, and the
+    # manifests which aren't available.
+    names = ["pkg_version"] + [x.name for x in get_audio_manifests(game.path).values()]
+    manifests = []
+    skipped = []
+    for name in names:
+        result = downloader.download_file(name, path.joinpath(name))
+        if result.error:
+            if name == "pkg_version":
+                raise RepairError(f"Couldn't download pkg_version: {result.error}")
+            print(f"{name} is not available, skipping that voicepack")
+            skipped.append(name)
             continue
+        manifests.append(Manifest.from_file(result.dest))
+    return Manifest.merge(*manifests), skipped
 
-        def verify(file_path: Path):
-            nonlocal target_files
-            nonlocal pkg_version
-            relative_path = file_path.relative_to(game.path)
-            relative_path_str = str(relative_path).replace("\\", "/")
-            # print(relative_path_str)
-            # Wtf mihoyo, you build this game for Windows and then use Unix path separator :moyai:
-            try:
-                target_file = pkg_version.pop(relative_path_str)
-                if target_file:
-                    with file_path.open("rb", buffering=0) as f:
-                        file_hash = hashlib.file_digest(f, "md5").hexdigest()
-                    if file_hash == target_file["md5"]:
-                        return
-                    print(
-                        f"Hash mismatch for {target_file['remoteName']} ({file_hash}; expected {target_file['md5']})"
-                    )
-                    target_files.append(file_path)
-            except KeyError:
-                # File not found in pkg_version
-                read_needed_files.append(file_path)
-
-        repair_executor.submit(verify, file)
-    repair_executor.shutdown(wait=True)
-    for file in read_needed_files:
+
+def switch_channel(
+    game: GameABC,
+    game_info: resource.Main,
+    workers: int = 8,
+    retries: int = 3,
+    progress: Callable[[DownloadResult, DownloadStats], None] = None,
+) -> DownloadStats:
+    """
+    Switches the game to another channel (e.g. overseas to China).
+
+    Both channels share most of their files, so instead of installing the
+    game again the manifest of the other channel is compared with the local
+    one: the channel specific executable and data folder are renamed, only
+    the files which differ are downloaded from `res_list_url` (in parallel,
+    straight to their final location), and the files which aren't in the
+    other channel are deleted.
+
+    Files are compared by their checksums in the manifests (or in the hash
+    index), they aren't read, so you may want to verify the game afterwards.
+
+    Args:
+        game (GameABC): The game.
+        game_info (Main): The game information of the other channel.
+        workers (int): How many files to download at once. Defaults to 8.
+        retries (int): How many times to retry a failed download. Defaults to 3.
+        progress (Callable[[DownloadResult, DownloadStats], None], optional):
+            Called after each file is downloaded.
+
+    Returns:
+        DownloadStats: The download statistics.
+    """
+    # Not is_installed(), it looks for the executable of the current channel
+    # which is renamed if a previous switch was interrupted.
+    if game.path is None or not game.path.joinpath("pkg_version").is_file():
+        raise GameNotInstalledError("Game is not installed.")
+    downloader = _get_downloader(game, game_info, workers, retries, progress)
+    staging_path = game.cache.joinpath("switch", game_info.major.version)
+    target, skipped = _download_manifests(game, downloader, staging_path)
+    local = Manifest.from_game(game, voicepacks=list(VoicePackLanguage))
+    renames: dict[str, str] = {}
+    for old, new in zip(_channel_names(local), _channel_names(target)):
+        if old and new and old != new:
+            renames[old] = new
+
+    def rename(path: str) -> str:
+        name, sep, rest = path.partition("/")
+        return renames.get(name, name) + sep + rest
+
+    for old, new in renames.items():
+        source = game.path.joinpath(old)
+        dest = game.path.joinpath(new)
+        # Already renamed if a previous switch was interrupted
+        if source.exists() and not dest.exists():
+            print(f"Renaming {old} to {new}")
+            source.rename(dest)
+    # Carry the verified hashes over to the new names.
+    renamed = [x for x in local if rename(x) != x]
+    for path in renamed:
         try:
-            with file.open("rb", buffering=0) as f:
-                # We only need to read 4 bytes to see if the file is readable or not
-                f.read(4)
-        except Exception:
-            print(f"File '{file}' is corrupted.")
-            target_files.append(file)
-    # value not used for now
-    for key, _ in pkg_version.items():
-        target_file = game.path.joinpath(key)
-        if target_file.is_file():
+            stat = game.path.joinpath(rename(path)).stat()
+        except OSError:
             continue
-        print(f"{key} not found.")
-        target_files.append(target_file)
-    if not target_files:
-        return
-    print("Begin repairing files...")
-    game.repair_files(target_files, game_info=game_info)
+        md5 = game.hash_index.get(path, stat)
+        if md5:
+            game.hash_index.set(rename(path), stat, md5)
+    game.hash_index.remove(renamed)
+    game.hash_index.commit()
+    # The files of skipped voicepacks are left alone, they would be deleted
+    # as extra files otherwise.
+    local_md5s = {
+        rename(x): local.md5(x) for x in local if local.origin(x) not in skipped
+    }
+    jobs = []
+    kept = 0
+    for entry in target.entries():
+        file = game.path.joinpath(entry.path)
+        try:
+            stat = file.stat()
+        except OSError:
+            stat = None
+        if stat is not None and stat.st_size == entry.size:
+            if entry.md5 in (
+                local_md5s.get(entry.path),
+                game.hash_index.get(entry.path, stat),
+            ):
+                kept += 1
+                continue
+        jobs.append((entry.path, file, entry.md5, entry.size))
+    extra_files = [x for x in local_md5s if x not in target]
+    print(
+        f"Keeping {kept} files, downloading {len(jobs)} files "
+        + f"({sum(x[3] for x in jobs) / 1000 / 1000:.2f} MB), "
+        + f"deleting {len(extra_files)} files"
+    )
+    _repair_with(game, downloader, jobs)
+    _delete_files(game, extra_files)
+    _forget_files(game, extra_files)
+    # Write the manifests last, so an interrupted switch is resumed from the
+    # local manifests.
+    for file in staging_path.iterdir():
+        _move_file(file, game.path.joinpath(file.name))
+    rmtree(staging_path, ignore_errors=True)
+    return downloader.stats
+
+
+def _install_jobs(
+    game: GameABC, manifest: Manifest
+) -> Iterator[tuple[str, Path, str | None, int | None]]:
+    for entry in manifest.entries():
+        file = game.path.joinpath(entry.path)
+        try:
+            stat = file.stat()
+        except OSError:
+            stat = None
+        if stat is not None and stat.st_size == entry.size:
+            # Downloaded by a previous (interrupted) install, or an existing
+            # file, hashing it is cheaper than downloading it again.
+            if game.hash_index.get(entry.path, stat) == entry.md5:
+                continue
+            if verify_package(file, entry.md5):
+                game.hash_index.set(entry.path, stat, entry.md5)
+                continue
+        yield entry.path, file, entry.md5, entry.size
+
+
+def install_scattered(
+    game: GameABC,
+    game_info: resource.Main,
+    workers: int = 8,
+    retries: int = 3,
+    progress: Callable[[DownloadResult, DownloadStats], None] = None,
+    adaptive: bool = True,
+) -> DownloadStats:
+    """
+    Installs (or completes) the game by downloading every file from
+    `res_list_url` instead of the packages.
+
+    Files are downloaded in parallel straight to their final location, so
+    unlike `install_archive()` there's no package to keep next to the
+    extracted files and nothing to decompress. Files which are already there
+    and match the manifest are kept, so an interrupted install can be
+    resumed.
+
+    Voicepacks aren't installed, like with the packages.
+
+    Args:
+        game (GameABC): The game.
+        game_info (Main): The game information of the version to install.
+        workers (int): How many files to download at once. Defaults to 8.
+        retries (int): How many times to retry a failed download. Defaults to 3.
+        progress (Callable[[DownloadResult, DownloadStats], None], optional):
+            Called after each file is downloaded.
+        adaptive (bool): Whether to adjust the number of concurrent downloads
+            to the server's response. Defaults to True.
+
+    Returns:
+        DownloadStats: The download statistics.
+    """
+    if game.path is None:
+        raise GameNotInstalledError("Game path is not set.")
+    game.path.mkdir(parents=True, exist_ok=True)
+    downloader = _get_downloader(game, game_info, workers, retries, progress, adaptive)
+    staging_path = game.cache.joinpath("install", game_info.major.version)
+    result = downloader.download_file(
+        "pkg_version", staging_path.joinpath("pkg_version")
+    )
+    if result.error:
+        raise RepairError(f"Couldn't download pkg_version: {result.error}")
+    manifest = Manifest.from_file(result.dest)
+    print(
+        f"Installing {len(manifest)} files "
+        + f"({manifest.total_size() / 1000 / 1000:.2f} MB)"
+    )
+    _repair_with(game, downloader, _install_jobs(game, manifest))
+    # Written last, so the game isn't seen as complete if this is interrupted.
+    _move_file(result.dest, game.path.joinpath("pkg_version"))
+    rmtree(staging_path, ignore_errors=True)
+    return downloader.stats
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+from os import PathLike
+from pathlib import Path
+from threading import Lock
+
+
+class HashIndex:
+    """
+    Persistent index of verified file hashes for a game installation.
+
+    Each entry stores the size, modification time and inode of a file at the
+    time its MD5 checksum was verified, so files which haven't been touched
+    since then don't need to be hashed again.
+
+    Paths are stored relative to the game folder with forward slashes, the
+    same way as in the "pkg_version" file.
+    """
+
+    def __init__(self, path: PathLike):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, "
+            "inode INTEGER NOT NULL, "
+            "md5 TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @property
+    def path(self) -> Path:
+        """
+        Path to the index database.
+        """
+        return self._path
+
+    def get(self, path: str, stat: os.stat_result) -> str | None:
+        """
+        Gets the verified MD5 checksum of a file.
+
+        Args:
+            path (str): The file path relative to the game folder.
+            stat (os.stat_result): The current stat of the file.
+
+        Returns:
+            str | None: The MD5 checksum, or `None` if the file isn't in the index
+                or has changed since it was verified.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, md5 FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[:3] != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+            return None
+        return row[3]
+
+    def set(self, path: str, stat: os.stat_result, md5: str) -> None:
+        """
+        Records the verified MD5 checksum of a file.
+
+        Changes are written to disk on `commit()`.
+
+        Args:
+            path (str): The file path relative to the game folder.
+            stat (os.stat_result): The stat of the file when it was hashed.
+            md5 (str): The MD5 checksum of the file.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, md5),
+            )
+
+    def remove(self, paths: list[str]) -> None:
+        """
+        Removes files from the index, e.g. because they were rewritten.
+
+        Changes are written to disk on `commit()`.
+
+        Args:
+            paths (list[str]): The file paths relative to the game folder.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM files WHERE path = ?", ((x,) for x in paths)
+            )
+
+    def clear(self) -> None:
+        """
+        Removes all files from the index.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+
+    def commit(self) -> None:
+        """
+        Writes pending changes to disk.
+        """
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        """
+        Writes pending changes to disk and closes the index.
+        """
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,227 @@
+import concurrent.futures
+import hashlib
+from os import PathLike
+from pathlib import Path
+from threading import Lock, local
+from time import monotonic
+from typing import Any, Iterable, Iterator
+from vollerei.common.concurrency import RateLimiter
+from vollerei.common.enums import StorageType
+
+
+# (small files workers, large files workers)
+_DEFAULT_WORKERS = {
+    StorageType.HDD: (2, 1),
+    StorageType.SSD: (8, 2),
+    StorageType.NVMe: (16, 4),
+}
+
+
+def _md5_file(path: PathLike, buffer_size: int, buffer: bytearray = None) -> str:
+    if buffer is None:
+        buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    file_hash = hashlib.md5()
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(view)
+            if not read:
+                break
+            file_hash.update(view[:read])
+    return file_hash.hexdigest()
+
+
+class HashResult:
+    """
+    The result of hashing a file.
+
+    `md5` is `None` if the file couldn't be read, in that case `error`
+    contains the exception.
+    """
+
+    def __init__(
+        self,
+        key: Any,
+        path: Path,
+        size: int,
+        md5: str | None,
+        error: Exception | None = None,
+    ):
+        self.key = key
+        self.path = path
+        self.size = size
+        self.md5 = md5
+        self.error = error
+
+
+class HashStats:
+    """
+    Statistics of a `Hasher`.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Hashing throughput in MB/s.
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.bytes / 1000 / 1000 / self.elapsed
+
+    def __str__(self) -> str:
+        return (
+            f"{self.files} files, {self.bytes / 1000 / 1000:.2f} MB "
+            + f"in {self.elapsed:.2f}s ({self.throughput:.2f} MB/s)"
+        )
+
+
+class Hasher:
+    """
+    Multi-threaded MD5 hashing engine for game files.
+
+    Small and large files are hashed in separate lanes, so a few huge asset
+    bundles don't hold up thousands of small files (and vice versa). Worker
+    counts default to values suited for the storage type, you can override them
+    if you know better.
+
+    Each thread reuses its own read buffer, and since `hashlib` releases the GIL
+    while hashing big chunks threads usually scale fine. If they don't, set
+    `use_processes` to hash large files in a process pool instead.
+
+    `max_rate` limits how many bytes per second are read, for hashing in the
+    background without hogging the disk.
+    """
+
+    def __init__(
+        self,
+        storage: StorageType = StorageType.SSD,
+        workers: int = None,
+        large_workers: int = None,
+        large_file_size: int = 64 * 1024 * 1024,
+        buffer_size: int = 1024 * 1024,
+        use_processes: bool = False,
+        max_rate: int = None,
+    ):
+        default_workers, default_large_workers = _DEFAULT_WORKERS[storage]
+        self.workers = workers or default_workers
+        self.large_workers = large_workers or default_large_workers
+        self.large_file_size = large_file_size
+        self.buffer_size = buffer_size
+        self.use_processes = use_processes
+        self.max_rate = max_rate
+        self._limiter = RateLimiter(max_rate) if max_rate else None
+        self.stats = HashStats()
+        self._stats_lock = Lock()
+        self._local = local()
+
+    def hash_file(self, path: PathLike) -> str:
+        """
+        Hashes a file with the thread's reusable buffer.
+
+        Args:
+            path (PathLike): The file to hash.
+
+        Returns:
+            str: The MD5 checksum of the file.
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = bytearray(self.buffer_size)
+            self._local.buffer = buffer
+        return _md5_file(path, self.buffer_size, buffer)
+
+    def _record(self, result: HashResult) -> HashResult:
+        if result.md5 is not None:
+            with self._stats_lock:
+                self.stats.files += 1
+                self.stats.bytes += result.size
+        return result
+
+    def _hash(self, key: Any, path: Path, size: int) -> HashResult:
+        try:
+            return HashResult(key, path, size, self.hash_file(path))
+        except Exception as e:
+            return HashResult(key, path, size, None, e)
+
+    def hash_files(
+        self, files: Iterable[tuple[Any, PathLike, int | None]]
+    ) -> Iterator[HashResult]:
+        """
+        Hashes files and yields the results as soon as they're available.
+
+        Args:
+            files (Iterable[tuple[Any, PathLike, int | None]]): (key, path, size)
+                tuples, `key` is passed back in the result untouched and `size`
+                can be `None` if it isn't known yet.
+
+        Returns:
+            Iterator[HashResult]: The results, in completion order.
+        """
+        start = monotonic()
+        small_executor = concurrent.futures.ThreadPoolExecutor(self.workers)
+        if self.use_processes:
+            large_executor = concurrent.futures.ProcessPoolExecutor(self.large_workers)
+        else:
+            large_executor = concurrent.futures.ThreadPoolExecutor(self.large_workers)
+        # Don't submit every file at once, that's a lot of futures for 50k+ files.
+        max_pending = (self.workers + self.large_workers) * 4
+        pending: dict[concurrent.futures.Future, tuple[Any, Path, int]] = {}
+
+        try:
+            for key, path, size in files:
+                path = Path(path)
+                if size is None:
+                    try:
+                        size = path.stat().st_size
+                    except OSError as e:
+                        yield HashResult(key, path, 0, None, e)
+                        continue
+                if self._limiter:
+                    self._limiter.consume(size)
+                if size < self.large_file_size:
+                    future = small_executor.submit(self._hash, key, path, size)
+                elif self.use_processes:
+                    future = large_executor.submit(
+                        _md5_file, str(path), self.buffer_size
+                    )
+                else:
+                    future = large_executor.submit(self._hash, key, path, size)
+                pending[future] = (key, path, size)
+                while len(pending) >= max_pending:
+                    done, _ = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        yield self._collect(pending, future)
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield self._collect(pending, future)
+        finally:
+            for future in pending:
+                future.cancel()
+            small_executor.shutdown(wait=True)
+            large_executor.shutdown(wait=True)
+            self.stats.elapsed += monotonic() - start
+
+    def _collect(
+        self,
+        pending: dict[concurrent.futures.Future, tuple[Any, Path, int]],
+        future: concurrent.futures.Future,
+    ) -> HashResult:
+        key, path, size = pending.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            # Only the process pool raises, threads return the error in the result
+            return HashResult(key, path, size, None, e)
+        if isinstance(result, HashResult):
+            return self._record(result)
+        return self._record(HashResult(key, path, size, result))
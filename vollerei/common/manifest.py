@@ -0,0 +1,326 @@
+import json
+import sys
+from array import array
+from os import PathLike
+from pathlib import Path
+from typing import Iterable, Iterator
+from vollerei.abc.launcher.game import GameABC
+from vollerei.common.enums import VoicePackLanguage
+
+
+_PARSE_BATCH_SIZE = 4096
+
+
+def audio_manifest_language(name: str) -> VoicePackLanguage | None:
+    """
+    Gets the voicepack language of an "Audio_<language>_pkg_version" file.
+
+    The language is written differently for each game, e.g. "English(US)" for
+    Genshin, "English" for Star Rail and "En" for Zenless Zone Zero.
+
+    Args:
+        name (str): The file name.
+
+    Returns:
+        VoicePackLanguage | None: The language, or `None` if the file isn't a
+            voicepack manifest.
+    """
+    if not name.startswith("Audio_") or not name.endswith("_pkg_version"):
+        return None
+    language = name[len("Audio_") : -len("_pkg_version")].split("(")[0]
+    try:
+        return VoicePackLanguage[language]
+    except KeyError:
+        pass
+    try:
+        return VoicePackLanguage.from_zzz_name(language)
+    except ValueError:
+        return None
+
+
+def get_audio_manifests(game_path: PathLike) -> dict[VoicePackLanguage, Path]:
+    """
+    Gets the voicepack manifests in the game folder.
+
+    Args:
+        game_path (PathLike): The game folder.
+
+    Returns:
+        dict[VoicePackLanguage, Path]: The manifest file of each language.
+    """
+    manifests = {}
+    for file in Path(game_path).glob("Audio_*_pkg_version"):
+        language = audio_manifest_language(file.name)
+        if language is not None:
+            manifests[language] = file
+    return manifests
+
+
+class ManifestEntry:
+    """
+    A file in a `Manifest`.
+    """
+
+    __slots__ = ("path", "md5", "size", "origin")
+
+    def __init__(self, path: str, md5: str, size: int, origin: str):
+        self.path = path
+        self.md5 = md5
+        self.size = size
+        self.origin = origin
+
+    def __repr__(self) -> str:
+        return f"ManifestEntry({self.path!r}, {self.md5!r}, {self.size})"
+
+
+class Manifest:
+    """
+    Compact representation of "pkg_version" files.
+
+    Instead of a dict for every file, the paths are interned and stored in a list,
+    the MD5 checksums are stored as 16 bytes each in a single `bytearray` and the
+    sizes in an `array`, so manifests with 50k+ files stay small in memory.
+
+    The manifest each file comes from (e.g. "pkg_version" or
+    "Audio_English(US)_pkg_version") is kept as the file's origin.
+    """
+
+    def __init__(self):
+        self._paths: list[str] = []
+        self._md5s = bytearray()
+        self._sizes = array("Q")
+        self._origins = array("H")
+        self._origin_names: list[str] = []
+        self._index: dict[str, int] = {}
+
+    @staticmethod
+    def from_lines(
+        lines: Iterable[str | bytes], origin: str = "pkg_version"
+    ) -> "Manifest":
+        """
+        Parses a manifest from its lines.
+
+        Args:
+            lines (Iterable[str | bytes]): The JSON lines of the manifest.
+            origin (str): The name of the manifest. Defaults to "pkg_version".
+
+        Returns:
+            Manifest: The parsed manifest.
+        """
+        manifest = Manifest()
+        manifest._parse(lines, origin)
+        return manifest
+
+    @staticmethod
+    def from_file(path: PathLike) -> "Manifest":
+        """
+        Parses a manifest file, the file is streamed line by line.
+
+        Args:
+            path (PathLike): Path to the manifest file.
+
+        Returns:
+            Manifest: The parsed manifest.
+        """
+        path = Path(path)
+        with path.open("rb") as f:
+            return Manifest.from_lines(f, origin=path.name)
+
+    @staticmethod
+    def from_game(
+        game: GameABC, voicepacks: list[VoicePackLanguage] | None = None
+    ) -> "Manifest":
+        """
+        Gets the manifest of a game installation.
+
+        The base game manifest is merged with the manifests of the installed
+        voicepacks.
+
+        Args:
+            game (GameABC): The game.
+            voicepacks (list[VoicePackLanguage], optional): The voicepacks to
+                include, defaults to the installed voicepacks.
+
+        Returns:
+            Manifest: The merged manifest.
+        """
+        if voicepacks is None:
+            voicepacks = game.get_installed_voicepacks()
+        manifests = [Manifest.from_file(game.path.joinpath("pkg_version"))]
+        for language, file in get_audio_manifests(game.path).items():
+            if language in voicepacks:
+                manifests.append(Manifest.from_file(file))
+        return Manifest.merge(*manifests)
+
+    @staticmethod
+    def merge(*manifests: "Manifest") -> "Manifest":
+        """
+        Merges manifests, later manifests take precedence for duplicated files.
+
+        Returns:
+            Manifest: The merged manifest.
+        """
+        merged = Manifest()
+        for manifest in manifests:
+            origin_ids = [merged._origin_id(x) for x in manifest._origin_names]
+            for i, path in enumerate(manifest._paths):
+                merged._add(
+                    path,
+                    bytes(manifest._md5s[i * 16 : i * 16 + 16]),
+                    manifest._sizes[i],
+                    origin_ids[manifest._origins[i]],
+                )
+        return merged
+
+    def _origin_id(self, origin: str) -> int:
+        try:
+            return self._origin_names.index(origin)
+        except ValueError:
+            self._origin_names.append(origin)
+            return len(self._origin_names) - 1
+
+    def _add(self, path: str, md5: bytes, size: int, origin_id: int) -> None:
+        i = self._index.get(path)
+        if i is not None:
+            self._md5s[i * 16 : i * 16 + 16] = md5
+            self._sizes[i] = size
+            self._origins[i] = origin_id
+            return
+        path = sys.intern(path)
+        self._index[path] = len(self._paths)
+        self._paths.append(path)
+        self._md5s += md5
+        self._sizes.append(size)
+        self._origins.append(origin_id)
+
+    def _parse(self, lines: Iterable[str | bytes], origin: str) -> None:
+        origin_id = self._origin_id(origin)
+        batch: list[str] = []
+
+        def parse_batch():
+            # One json.loads() call for the whole batch is much faster than
+            # calling it for every line.
+            for line_json in json.loads("[" + ",".join(batch) + "]"):
+                self._add(
+                    line_json["remoteName"],
+                    bytes.fromhex(line_json["md5"]),
+                    int(line_json["fileSize"]),
+                    origin_id,
+                )
+            batch.clear()
+
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode()
+            line = line.strip()
+            if not line:
+                continue
+            batch.append(line)
+            if len(batch) >= _PARSE_BATCH_SIZE:
+                parse_batch()
+        if batch:
+            parse_batch()
+
+    def add(self, path: str, md5: str, size: int, origin: str = "pkg_version"):
+        """
+        Adds a file to the manifest, replacing it if it's already there.
+
+        Args:
+            path (str): The file path relative to the game folder.
+            md5 (str): The MD5 checksum of the file.
+            size (int): The file size.
+            origin (str): The manifest name. Defaults to "pkg_version".
+        """
+        self._add(path, bytes.fromhex(md5), size, self._origin_id(origin))
+
+    @property
+    def origins(self) -> list[str]:
+        """
+        Names of the manifests this manifest is made from.
+        """
+        return list(self._origin_names)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __getitem__(self, path: str) -> ManifestEntry:
+        entry = self.get(path)
+        if entry is None:
+            raise KeyError(path)
+        return entry
+
+    def get(self, path: str) -> ManifestEntry | None:
+        """
+        Gets a file in the manifest.
+
+        Args:
+            path (str): The file path relative to the game folder.
+
+        Returns:
+            ManifestEntry | None: The file, or `None` if it isn't in the manifest.
+        """
+        i = self._index.get(path)
+        if i is None:
+            return None
+        return ManifestEntry(
+            path,
+            self._md5s[i * 16 : i * 16 + 16].hex(),
+            self._sizes[i],
+            self._origin_names[self._origins[i]],
+        )
+
+    def md5(self, path: str) -> str:
+        """
+        Gets the MD5 checksum of a file.
+        """
+        i = self._index[path]
+        return self._md5s[i * 16 : i * 16 + 16].hex()
+
+    def size(self, path: str) -> int:
+        """
+        Gets the size of a file.
+        """
+        return self._sizes[self._index[path]]
+
+    def origin(self, path: str) -> str:
+        """
+        Gets the name of the manifest a file comes from.
+        """
+        return self._origin_names[self._origins[self._index[path]]]
+
+    def entries(self, origin: str | None = None) -> Iterator[ManifestEntry]:
+        """
+        Iterates over the files in the manifest.
+
+        Args:
+            origin (str, optional): Only iterate over the files from this manifest.
+
+        Returns:
+            Iterator[ManifestEntry]: The files.
+        """
+        origin_id = None
+        if origin is not None:
+            if origin not in self._origin_names:
+                return
+            origin_id = self._origin_names.index(origin)
+        for i, path in enumerate(self._paths):
+            if origin_id is not None and self._origins[i] != origin_id:
+                continue
+            yield ManifestEntry(
+                path,
+                self._md5s[i * 16 : i * 16 + 16].hex(),
+                self._sizes[i],
+                self._origin_names[self._origins[i]],
+            )
+
+    def total_size(self) -> int:
+        """
+        Gets the total size of the files in the manifest.
+        """
+        return sum(self._sizes)
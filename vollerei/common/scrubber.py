@@ -0,0 +1,200 @@
+import platform
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from time import monotonic
+from typing import Callable
+from vollerei.abc.launcher.game import GameABC
+from vollerei.common.enums import FileStatus, VerifyLevel
+from vollerei.common.functions import VerifyResult, verify_game
+from vollerei.common.hashing import Hasher
+
+match platform.system():
+    case "Linux":
+        from vollerei.utils.linux import Inotify, set_idle_priority
+    case _:
+        Inotify = None
+        set_idle_priority = None
+
+
+class Scrubber:
+    """
+    Background integrity scrubber for a game installation.
+
+    Every `interval` seconds all game files are hashed again, ignoring the hash
+    index so silent corruption is found too. Reading is throttled to `rate`
+    bytes per second, 32 MB/s by default (1 MB = 1000 * 1000 bytes, as in the
+    hashing statistics).
+
+    On Linux, files written in the game folder are tracked with inotify and
+    rehashed once they haven't changed for `settle` seconds, and the scrubber
+    runs at idle CPU and I/O priority so it doesn't slow down the game.
+
+    Broken files are passed to `on_broken`, and repaired with the game's
+    `repair_files()` if `repair` is set.
+    """
+
+    def __init__(
+        self,
+        game: GameABC,
+        interval: float = 24 * 60 * 60,
+        rate: int = 32 * 1000 * 1000,
+        settle: float = 30.0,
+        repair: bool = False,
+        on_broken: Callable[[VerifyResult], None] = None,
+        hasher: Hasher = None,
+    ):
+        self.game = game
+        self.interval = interval
+        self.rate = rate
+        self.settle = settle
+        self.repair = repair
+        self.on_broken = on_broken
+        self.hasher = hasher or Hasher(workers=1, large_workers=1, max_rate=rate)
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        """
+        Starts scrubbing in a background thread.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self.run, name="vollerei-scrubber", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread, the current file is hashed to the end.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def scrub(
+        self,
+        files: list[str] | None = None,
+        level: VerifyLevel = VerifyLevel.Paranoid,
+    ) -> list[VerifyResult]:
+        """
+        Verifies the game files now, blocking until they are verified.
+
+        The files are verified in a separate thread at idle priority, like in
+        the background thread, so the calling thread's priority isn't changed.
+
+        Args:
+            files (list[str], optional): Only verify these files, the paths are
+                relative to the game folder. Defaults to every file.
+            level (VerifyLevel): How thoroughly the files are verified. Defaults
+                to `VerifyLevel.Paranoid`, so every file is hashed.
+
+        Returns:
+            list[VerifyResult]: The broken files.
+        """
+
+        def idle_scrub() -> list[VerifyResult]:
+            self._lower_priority()
+            # Only the background thread is stopped by stop().
+            return self._scrub(files, level, Event())
+
+        with ThreadPoolExecutor(1, thread_name_prefix="vollerei-scrubber") as pool:
+            return pool.submit(idle_scrub).result()
+
+    def _scrub(
+        self, files: list[str] | None, level: VerifyLevel, stop: Event
+    ) -> list[VerifyResult]:
+        broken: list[VerifyResult] = []
+        results = verify_game(self.game, level=level, hasher=self.hasher, files=files)
+        try:
+            for result in results:
+                if stop.is_set():
+                    break
+                if result.status == FileStatus.OK:
+                    continue
+                broken.append(result)
+                if self.on_broken:
+                    self.on_broken(result)
+        finally:
+            results.close()
+        if broken and self.repair and not stop.is_set():
+            self.game.repair_files([x.path for x in broken])
+        return broken
+
+    def _lower_priority(self) -> None:
+        if set_idle_priority is None:
+            return
+        try:
+            set_idle_priority()
+        except OSError as e:
+            print(f"Can't lower the scrubber priority: {e}")
+
+    def _watch(self) -> "Inotify | None":
+        if Inotify is None:
+            return None
+        # Events meaning a file has (likely) been rewritten
+        self._watch_mask = (
+            Inotify.IN_CLOSE_WRITE
+            | Inotify.IN_MOVED_TO
+            | Inotify.IN_CREATE
+            | Inotify.IN_DELETE
+        )
+        try:
+            inotify = Inotify()
+            inotify.add_tree(self.game.path, self._watch_mask, exclude=["webCaches"])
+        except OSError as e:
+            # e.g. too many folders for fs.inotify.max_user_watches
+            print(f"Can't track file changes, only full scrubs will run: {e}")
+            return None
+        return inotify
+
+    def run(self) -> None:
+        """
+        Scrubs until `stop()` is called, this blocks the calling thread.
+        """
+        self._lower_priority()
+        inotify = self._watch()
+        # Relative path -> last time it changed
+        changed: dict[str, float] = {}
+        next_full = monotonic() + self.interval
+        try:
+            while not self._stop.is_set():
+                now = monotonic()
+                timeout = next_full - now
+                if changed:
+                    timeout = min(timeout, self.settle)
+                timeout = max(min(timeout, 1.0), 0)
+                if inotify is None:
+                    self._stop.wait(timeout)
+                else:
+                    for path, mask in inotify.read(timeout):
+                        if path is None:
+                            # Events were lost, check every file which changed.
+                            changed[""] = monotonic()
+                            continue
+                        if mask & Inotify.IN_ISDIR:
+                            if mask & (Inotify.IN_CREATE | Inotify.IN_MOVED_TO):
+                                try:
+                                    inotify.add_tree(path, self._watch_mask)
+                                except OSError:
+                                    # Deleted already
+                                    pass
+                            continue
+                        relative_path = path.relative_to(self.game.path)
+                        changed[str(relative_path).replace("\\", "/")] = monotonic()
+                now = monotonic()
+                ready = [x for x, t in changed.items() if now - t >= self.settle]
+                if ready:
+                    for x in ready:
+                        changed.pop(x)
+                    if "" in ready:
+                        # Only the files which changed are hashed.
+                        self._scrub(None, VerifyLevel.Standard, self._stop)
+                    else:
+                        self._scrub(ready, VerifyLevel.Standard, self._stop)
+                if now >= next_full:
+                    self._scrub(None, VerifyLevel.Paranoid, self._stop)
+                    next_full = monotonic() + self.interval
+        finally:
+            if inotify is not None:
+                inotify.close()
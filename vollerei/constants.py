@@ -26,3 +26,19 @@ TELEMETRY_HOSTS = [
     "public-data-api.mihoyo.com",
 ]
 HDIFFPATCH_GIT_URL = "https://github.com/sisong/HDiffPatch"
+# Files and folders in the game folder which aren't in any manifest but aren't
+# junk either, matched against the name and the path relative to the game folder.
+ORPHAN_EXCLUDE = [
+    "webCaches",
+    "SDKCaches",
+    "ScreenShot",
+    "ScreenShots",
+    # Resources downloaded by the game itself
+    "*_Data/Persistent",
+    # Executables and libraries may be added by patchers and mods
+    "*.exe",
+    "*.dll",
+    "config.ini",
+    "pkg_version",
+    "Audio_*_pkg_version",
+]
@@ -37,6 +37,12 @@ class ScatteredFilesNotAvailableError(RepairError):
     pass
 
 
+class ChecksumMismatchError(RepairError):
+    """Downloaded file doesn't match the expected checksum."""
+
+    pass
+
+
 class GameNotUpdatedError(GameError):
     """Game is not updated."""
 
@@ -47,3 +53,9 @@ class PreDownloadNotAvailable(GameError):
     """Pre-download version is not available."""
 
     pass
+
+
+class StagedUpdateError(GameError):
+    """Staged update can't be applied."""
+
+    pass
@@ -0,0 +1,13 @@
+from vollerei.exceptions import VollereiError
+
+
+class NetworkError(VollereiError):
+    """Base class for exceptions in related to the network."""
+
+    pass
+
+
+class OfflineError(NetworkError):
+    """Something needs the network while in offline mode."""
+
+    pass
@@ -1,5 +1,6 @@
 from vollerei.common.enums import GameChannel
 from vollerei.abc.launcher.game import GameABC
+from vollerei.game.version import sniff_version
 from vollerei.exceptions.game import GameNotInstalledError
 
 
@@ -12,7 +13,8 @@ def get_channel(game: GameABC) -> GameChannel:
     """
     if game.channel_override:
         return game.channel_override
-    if not game.is_installed():
+    # Not is_installed(), it needs the channel to find the data folder.
+    if game.path is None:
         raise GameNotInstalledError("Game path is not set.")
     if game.path.joinpath("YuanShen.exe").is_file():
         return GameChannel.China
@@ -37,50 +39,9 @@ def get_version(game: GameABC) -> tuple[int, int, int]:
     Returns:
         tuple[int, int, int]: The version as a tuple of integers.
     """
-
     data_file = game.data_folder().joinpath("globalgamemanagers")
-    if not data_file.exists():
+    version = sniff_version(data_file, offset=4000, terminator=b"_")
+    if version is None:
+        # Fallback to config.ini
         return game.get_version_config()
-
-    def bytes_to_int(byte_array: list[bytes]) -> int:
-        bytes_as_int = int.from_bytes(byte_array, byteorder="big")
-        actual_int = bytes_as_int - 48  # 48 is the ASCII code for 0
-        return actual_int
-
-    version_bytes: list[list[bytes]] = [[], [], []]
-    version_ptr = 0
-    correct = True
-    try:
-        with data_file.open("rb") as f:
-            f.seek(4000)
-            for byte in f.read(10000):
-                match byte:
-                    case 0:
-                        version_bytes = [[], [], []]
-                        version_ptr = 0
-                        correct = True
-                    case 46:
-                        version_ptr += 1
-                        if version_ptr > 2:
-                            correct = False
-                    case 95:
-                        if (
-                            correct
-                            and len(version_bytes[0]) > 0
-                            and len(version_bytes[1]) > 0
-                            and len(version_bytes[2]) > 0
-                        ):
-                            return (
-                                bytes_to_int(version_bytes[0]),
-                                bytes_to_int(version_bytes[1]),
-                                bytes_to_int(version_bytes[2]),
-                            )
-                    case _:
-                        if correct and byte in b"0123456789":
-                            version_bytes[version_ptr].append(byte)
-                        else:
-                            correct = False
-    except Exception:
-        pass
-    # Fallback to config.ini
-    return game.get_version_config()
+    return version
@@ -1,6 +1,7 @@
 from hashlib import md5
 from vollerei.common.enums import GameChannel
 from vollerei.abc.launcher.game import GameABC
+from vollerei.game.version import sniff_version
 from vollerei.game.hsr.constants import MD5SUMS
 
 
@@ -19,8 +20,8 @@ def get_channel(game: GameABC) -> GameChannel | None:
     """
     version = game.version_override or game.get_version()
     if version == (1, 0, 5):
-        for channel, v in MD5SUMS["1.0.5"].values():
-            for file, md5sum in v.values():
+        for channel, v in MD5SUMS["1.0.5"].items():
+            for file, md5sum in v.items():
                 if md5(game.path.joinpath(file).read_bytes()).hexdigest() != md5sum:
                     continue
                 match channel:
@@ -49,50 +50,9 @@ def get_version(game: GameABC) -> tuple[int, int, int]:
     Returns:
         tuple[int, int, int]: The version as a tuple of integers.
     """
-
     data_file = game.data_folder().joinpath("data.unity3d")
-    if not data_file.exists():
+    version = sniff_version(data_file, offset=0x7D0, terminator=b"&")
+    if version is None:
+        # Fallback to config.ini
         return game.get_version_config()
-
-    def bytes_to_int(byte_array: list[bytes]) -> int:
-        bytes_as_int = int.from_bytes(byte_array, byteorder="big")
-        actual_int = bytes_as_int - 48  # 48 is the ASCII code for 0
-        return actual_int
-
-    version_bytes: list[list[bytes]] = [[], [], []]
-    version_ptr = 0
-    correct = True
-    try:
-        with data_file.open("rb") as f:
-            f.seek(0x7D0)  # 2000 in decimal
-            for byte in f.read(10000):
-                match byte:
-                    case 0:
-                        version_bytes = [[], [], []]
-                        version_ptr = 0
-                        correct = True
-                    case 46:
-                        version_ptr += 1
-                        if version_ptr > 2:
-                            correct = False
-                    case 38:
-                        if (
-                            correct
-                            and len(version_bytes[0]) > 0
-                            and len(version_bytes[1]) > 0
-                            and len(version_bytes[2]) > 0
-                        ):
-                            return (
-                                bytes_to_int(version_bytes[0]),
-                                bytes_to_int(version_bytes[1]),
-                                bytes_to_int(version_bytes[2]),
-                            )
-                    case _:
-                        if correct and byte in b"0123456789":
-                            version_bytes[version_ptr].append(byte)
-                        else:
-                            correct = False
-    except Exception:
-        pass
-    # Fallback to config.ini
-    return game.get_version_config()
+    return version
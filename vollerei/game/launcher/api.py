@@ -1,4 +1,4 @@
-from vollerei.common.api import get_game_packages, resource
+from vollerei.common.api import flight, get_game_packages, resource
 from vollerei.common.enums import GameChannel, GameType
 
 
@@ -10,7 +10,8 @@ def get_game_package(
 
     Doesn't work with HI3 but well, we haven't implemented anything for that game yet.
 
-    Default channel is overseas.
+    Default channel is overseas. Concurrent calls for the same game share a
+    single request.
 
     Args:
         channel: Game channel to get the resource information from.
@@ -18,6 +19,12 @@ def get_game_package(
     Returns:
         GameInfo: Game resource information.
     """
+    return flight.do(
+        ("game_package", game_type, channel), _get_game_package, game_type, channel
+    )
+
+
+def _get_game_package(game_type: GameType, channel: GameChannel) -> resource.GameInfo:
     find_str: str
     match game_type:
         case GameType.HSR:
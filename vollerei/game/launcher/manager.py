@@ -1,18 +1,34 @@
+import json
 from configparser import ConfigParser
+from hashlib import md5
 from io import IOBase
 from os import PathLike
 from pathlib import Path, PurePath
+from typing import Callable, Iterator
 from vollerei.abc.launcher.game import GameABC
 from vollerei.common import ConfigFile, functions
 from vollerei.common.api import resource
-from vollerei.common.enums import GameType, VoicePackLanguage, GameChannel
+from vollerei.common.downloader import DownloadResult, DownloadStats
+from vollerei.common.enums import (
+    GameType,
+    VoicePackLanguage,
+    GameChannel,
+    RepairStrategy,
+    VerifyLevel,
+)
+from vollerei.common.hashindex import HashIndex
+from vollerei.common.hashing import Hasher
 from vollerei.exceptions.game import (
+    ChecksumMismatchError,
     GameAlreadyUpdatedError,
     GameNotInstalledError,
     PreDownloadNotAvailable,
+    StagedUpdateError,
 )
 from vollerei.game.launcher import api
+from vollerei.game.launcher.probe import InstallProbe
 from vollerei.game.hsr import functions as hsr_functions
+from vollerei.game.hsr.constants import MD5SUMS
 from vollerei.game.genshin import functions as genshin_functions
 from vollerei.game.zzz import functions as zzz_functions
 from vollerei import paths
@@ -42,6 +58,8 @@ class Game(GameABC):
         self.cache.mkdir(parents=True, exist_ok=True)
         self._version_override: tuple[int, int, int] | None = None
         self._channel_override: GameChannel | None = None
+        self._hash_index: HashIndex | None = None
+        self._probe = InstallProbe()
 
     @property
     def version_override(self) -> tuple[int, int, int] | None:
@@ -58,6 +76,7 @@ class Game(GameABC):
         if isinstance(version, str):
             version = tuple(int(i) for i in version.split("."))
         self._version_override = version
+        self._probe.invalidate()
 
     @property
     def channel_override(self) -> GameChannel | None:
@@ -77,6 +96,7 @@ class Game(GameABC):
         if isinstance(channel, str):
             channel = GameChannel[channel]
         self._channel_override = channel
+        self._probe.invalidate()
 
     @property
     def path(self) -> Path | None:
@@ -88,6 +108,48 @@ class Game(GameABC):
     @path.setter
     def path(self, path: PathLike):
         self._path = Path(path)
+        self._probe.invalidate()
+        if self._hash_index:
+            self._hash_index.close()
+            self._hash_index = None
+
+    @property
+    def hash_index(self) -> HashIndex:
+        """
+        The persistent index of verified file hashes for this installation.
+
+        It's used by `repair_game()` to skip files that haven't changed since
+        they were last verified.
+        """
+        if self._hash_index is None:
+            if self._path is None:
+                raise GameNotInstalledError("Game path is not set.")
+            index_name = md5(str(self._path.resolve()).encode()).hexdigest()
+            self._hash_index = HashIndex(
+                paths.data_path.joinpath("index", f"{index_name}.sqlite3")
+            )
+        return self._hash_index
+
+    @property
+    def probe(self) -> InstallProbe:
+        """
+        The memoized installation state, used by `is_installed()`,
+        `get_version()`, `get_channel()` and `get_installed_voicepacks()`.
+
+        It's invalidated after installing or updating the game through this
+        class, call `probe.invalidate()` if you change the installation
+        yourself.
+        """
+        return self._probe
+
+    def _version_files(self) -> list[Path]:
+        # The files get_version() reads
+        match self._game_type:
+            case GameType.HSR:
+                data_file = self.data_folder().joinpath("data.unity3d")
+            case _:
+                data_file = self.data_folder().joinpath("globalgamemanagers")
+        return [data_file, self._path.joinpath("config.ini")]
 
     def data_folder(self) -> Path:
         """
@@ -124,22 +186,21 @@ class Game(GameABC):
             case GameType.Genshin:
                 match self.get_channel():
                     case GameChannel.China:
-                        if not self._path.joinpath("YuanShen.exe").exists():
-                            return False
-                    case GameChannel.Overseas:
-                        if not self._path.joinpath("GenshinImpact.exe").exists():
-                            return False
+                        exe_file = self._path.joinpath("YuanShen.exe")
+                    case _:
+                        exe_file = self._path.joinpath("GenshinImpact.exe")
             case GameType.HSR:
-                if not self._path.joinpath("StarRail.exe").exists():
-                    return False
+                exe_file = self._path.joinpath("StarRail.exe")
             case GameType.ZZZ:
-                if not self._path.joinpath("ZenlessZoneZero.exe").exists():
-                    return False
-        if not self.data_folder().is_dir():
-            return False
-        if self.get_version() == (0, 0, 0):
-            return False
-        return True
+                exe_file = self._path.joinpath("ZenlessZoneZero.exe")
+        data_folder = self.data_folder()
+        return self._probe.get(
+            "installed",
+            [exe_file, data_folder] + self._version_files(),
+            lambda: exe_file.exists()
+            and data_folder.is_dir()
+            and self.get_version() != (0, 0, 0),
+        )
 
     def get_channel(self) -> GameChannel:
         """
@@ -156,14 +217,31 @@ class Game(GameABC):
         """
         match self._game_type:
             case GameType.HSR:
+                # 1.0.5 is detected by hashing the DLLs, so only do it once.
+                files = self._version_files() + [
+                    self._path.joinpath(x) for x in MD5SUMS["1.0.5"]["os"]
+                ]
                 return (
-                    hsr_functions.get_channel(self)
+                    self._probe.get(
+                        "channel", files, lambda: hsr_functions.get_channel(self)
+                    )
                     or self._channel_override
                     or GameChannel.Overseas
                 )
             case GameType.Genshin:
+                files = []
+                if self._path:
+                    # Both, switching channels renames one to the other.
+                    files = [
+                        self._path.joinpath("YuanShen.exe"),
+                        self._path.joinpath("GenshinImpact.exe"),
+                    ]
                 return (
-                    genshin_functions.get_channel(self)
+                    self._probe.get(
+                        "channel",
+                        files,
+                        lambda: genshin_functions.get_channel(self),
+                    )
                     or self._channel_override
                     or GameChannel.Overseas
                 )
@@ -247,6 +325,7 @@ class Game(GameABC):
             cfg = ConfigParser()
             cfg.read_dict(cfg_dict)
             cfg.write(cfg_file.open("w"))
+        self._probe.invalidate("version")
 
     def get_version(self) -> tuple[int, int, int]:
         """
@@ -268,13 +347,16 @@ class Game(GameABC):
         """
         match self._game_type:
             case GameType.HSR:
-                return hsr_functions.get_version(self)
+                get_version = hsr_functions.get_version
             case GameType.Genshin:
-                return genshin_functions.get_version(self)
+                get_version = genshin_functions.get_version
             case GameType.ZZZ:
-                return zzz_functions.get_version(self)
+                get_version = zzz_functions.get_version
             case _:
                 return self.get_version_config()
+        return self._probe.get(
+            "version", self._version_files(), lambda: get_version(self)
+        )
 
     def get_version_str(self) -> str:
         """
@@ -295,11 +377,27 @@ class Game(GameABC):
         Returns:
             list[VoicePackLanguage]: A list of installed voicepacks.
         """
+        return list(self.get_voicepack_folders())
+
+    def get_voicepack_folders(self) -> dict[VoicePackLanguage, Path]:
+        """
+        Gets the audio folder of each installed voicepack.
+
+        Returns:
+            dict[VoicePackLanguage, Path]: The folder of each voicepack.
+        """
         if not self.is_installed():
             raise GameNotInstalledError("Game is not installed.")
-        voicepacks = []
-        blacklisted_words = ["SFX"]
-        audio_package: Path
+        audio_package = self._get_audio_package_path()
+        # Adding or removing a language changes the folder modification time.
+        folders = self._probe.get(
+            "voicepacks",
+            [audio_package.parent, audio_package],
+            lambda: self._find_voicepack_folders(audio_package),
+        )
+        return dict(folders)
+
+    def _get_audio_package_path(self) -> Path:
         match self._game_type:
             case GameType.Genshin:
                 audio_package = self.data_folder().joinpath(
@@ -315,6 +413,16 @@ class Game(GameABC):
                 audio_package = self.data_folder().joinpath(
                     "StreamingAssets/Audio/Windows/Full/"
                 )
+        return audio_package
+
+    def _find_voicepack_folders(
+        self, audio_package: Path
+    ) -> dict[VoicePackLanguage, Path]:
+        voicepacks = {}
+        # Not created until a voicepack is installed
+        if not audio_package.is_dir():
+            return voicepacks
+        blacklisted_words = ["SFX"]
         for child in audio_package.iterdir():
             if child.resolve().is_dir() and child.name not in blacklisted_words:
                 name = child.name
@@ -326,7 +434,7 @@ class Game(GameABC):
                         voicepack = VoicePackLanguage.from_zzz_name(child.name)
                     else:
                         voicepack = VoicePackLanguage[name]
-                    voicepacks.append(voicepack)
+                    voicepacks[voicepack] = child
                 except (ValueError, KeyError):
                     pass
         return voicepacks
@@ -387,44 +495,324 @@ class Game(GameABC):
         """
         Repairs a game file.
 
-        This will automatically handle backup and restore the file if the repair
-        fails.
+        The old file is kept if the repair fails.
 
         Args:
             file (PathLike): The file to repair.
             pre_download (bool): Whether to get the pre-download version.
                 Defaults to False.
         """
-        return self.repair_files([file], pre_download=pre_download, game_info=game_info)
+        self.repair_files([file], pre_download=pre_download, game_info=game_info)
 
     def repair_files(
         self,
         files: list[PathLike],
         pre_download: bool = False,
         game_info: resource.Game = None,
-    ) -> None:
+        workers: int = 8,
+        retries: int = 3,
+        progress: Callable[[DownloadResult, DownloadStats], None] = None,
+        adaptive: bool = True,
+        strategy: RepairStrategy = RepairStrategy.Auto,
+        use_cache: bool = True,
+        keep_packages: bool = False,
+    ) -> DownloadStats:
         """
         Repairs multiple game files.
 
-        This will automatically handle backup and restore the file if the repair
-        fails.
+        The files are extracted from the cached packages of the installed
+        version if possible, otherwise downloaded in parallel. They're verified
+        against the manifest and replaced atomically, so the old file is kept if
+        the repair fails.
 
         Args:
             files (PathLike): The files to repair.
             pre_download (bool): Whether to get the pre-download version.
                 Defaults to False.
             game_info (resource.Game): The game information to use for repair.
-        """
-        functions.repair_files(
-            self, files, pre_download=pre_download, game_info=game_info
+            workers (int): How many files to download at once. Defaults to 8.
+            retries (int): How many times to retry a failed download. Defaults to 3.
+            progress (Callable[[DownloadResult, DownloadStats], None], optional):
+                Called after each file is downloaded.
+            adaptive (bool): Whether to adjust the number of concurrent downloads
+                to the server's response. Defaults to True.
+            strategy (RepairStrategy): Whether to download the files one by one,
+                extract them from the game packages or pick the cheaper way.
+                Defaults to `RepairStrategy.Auto`.
+            use_cache (bool): Whether to extract the files from the packages
+                still in the cache first. Defaults to True.
+            keep_packages (bool): Whether to keep the packages downloaded to
+                repair the files in the cache. Defaults to False.
+
+        Returns:
+            DownloadStats: The download statistics, including the throughput.
+        """
+        return functions.repair_files(
+            self,
+            files,
+            pre_download=pre_download,
+            game_info=game_info,
+            workers=workers,
+            retries=retries,
+            progress=progress,
+            adaptive=adaptive,
+            strategy=strategy,
+            use_cache=use_cache,
+            keep_packages=keep_packages,
         )
 
-    def repair_game(self) -> None:
+    def repair_game(
+        self,
+        level: VerifyLevel = VerifyLevel.Standard,
+        hasher: Hasher = None,
+        check_extra_files: bool = False,
+        voicepacks: list[VoicePackLanguage] | None = None,
+        streaming: bool = False,
+        strategy: RepairStrategy = RepairStrategy.Auto,
+        keep_packages: bool = False,
+        progress: Callable[[DownloadResult, DownloadStats], None] = None,
+    ) -> None:
         """
         Tries to repair the game by reading "pkg_version" file and downloading the
         mismatched files from the server.
+
+        Args:
+            level (VerifyLevel): How thoroughly the files are verified, see
+                `VerifyLevel` for more info. Defaults to `VerifyLevel.Standard`.
+            hasher (Hasher, optional): The hashing engine to use, useful to tune
+                the worker count for the storage the game is installed on.
+            check_extra_files (bool): Whether to also check if the files which
+                aren't in "pkg_version" are readable. Defaults to False.
+            voicepacks (list[VoicePackLanguage], optional): Only verify the files
+                of these voicepacks, by default the base game and all installed
+                voicepacks are verified.
+            streaming (bool): Whether to download broken files as soon as they're
+                found, so hashing and downloading overlap. Defaults to False.
+            strategy (RepairStrategy): How to download the broken files, see
+                `RepairStrategy` for more info. Defaults to `RepairStrategy.Auto`.
+            keep_packages (bool): Whether to keep the packages downloaded to
+                repair the files in the cache. Defaults to False.
+            progress (Callable[[DownloadResult, DownloadStats], None], optional):
+                Called after each broken file is downloaded.
+        """
+        functions.repair_game(
+            self,
+            level=level,
+            hasher=hasher,
+            check_extra_files=check_extra_files,
+            voicepacks=voicepacks,
+            streaming=streaming,
+            strategy=strategy,
+            keep_packages=keep_packages,
+            progress=progress,
+        )
+
+    def verify_game(
+        self,
+        level: VerifyLevel = VerifyLevel.Standard,
+        hasher: Hasher = None,
+        check_extra_files: bool = False,
+        voicepacks: list[VoicePackLanguage] | None = None,
+        files: list[str] | None = None,
+    ) -> Iterator[functions.VerifyResult]:
+        """
+        Verifies the game files without repairing them.
+
+        The results are yielded as soon as they're available, so you can show
+        the progress or act on broken files right away.
+
+        Args:
+            level (VerifyLevel): How thoroughly the files are verified, see
+                `VerifyLevel` for more info. Defaults to `VerifyLevel.Standard`.
+            hasher (Hasher, optional): The hashing engine to use.
+            check_extra_files (bool): Whether to also check if the files which
+                aren't in "pkg_version" are readable. Defaults to False.
+            voicepacks (list[VoicePackLanguage], optional): Only verify the files
+                of these voicepacks.
+            files (list[str], optional): Only verify these files, the paths are
+                relative to the game folder like in "pkg_version".
+
+        Returns:
+            Iterator[VerifyResult]: The verification result of each file.
+        """
+        return functions.verify_game(
+            self,
+            level=level,
+            hasher=hasher,
+            check_extra_files=check_extra_files,
+            voicepacks=voicepacks,
+            files=files,
+        )
+
+    def quick_check(
+        self,
+        sample_size: int = 128,
+        tolerance: float = 0.02,
+        hasher: Hasher = None,
+        voicepacks: list[VoicePackLanguage] | None = None,
+        seed: int | None = None,
+    ) -> functions.QuickCheckResult:
+        """
+        Quickly estimates the health of the game installation.
+
+        Every file is checked for presence and size and a random sample of them,
+        weighted towards recently modified and bigger files, is hashed.
+
+        Args:
+            sample_size (int): How many files to hash. Defaults to 128.
+            tolerance (float): The fraction of corrupted files the confidence is
+                computed for. Defaults to 0.02.
+            hasher (Hasher, optional): The hashing engine to use.
+            voicepacks (list[VoicePackLanguage], optional): Only check the files
+                of these voicepacks.
+            seed (int, optional): Seed for the random sample.
+
+        Returns:
+            QuickCheckResult: The broken files, the confidence estimate and the
+                files worth verifying fully.
+        """
+        return functions.quick_check(
+            self,
+            sample_size=sample_size,
+            tolerance=tolerance,
+            hasher=hasher,
+            voicepacks=voicepacks,
+            seed=seed,
+        )
+
+    def get_voicepack_inventory(
+        self, refresh: bool = False
+    ) -> dict[VoicePackLanguage, functions.VoicepackInfo]:
+        """
+        Gets the file count, size and completeness of each installed voicepack.
+
+        See `vollerei.common.functions.get_voicepack_inventory()` for more info.
+
+        Args:
+            refresh (bool): Whether to rebuild the whole inventory. Defaults to
+                False.
+
+        Returns:
+            dict[VoicePackLanguage, VoicepackInfo]: The inventory of each voicepack.
+        """
+        return functions.get_voicepack_inventory(self, refresh=refresh)
+
+    def install_scattered(
+        self,
+        pre_download: bool = False,
+        game_info: resource.Main = None,
+        workers: int = 8,
+        retries: int = 3,
+        progress: Callable[[DownloadResult, DownloadStats], None] = None,
+        adaptive: bool = True,
+    ) -> DownloadStats:
+        """
+        Installs (or completes) the game by downloading every file from
+        `res_list_url` instead of the packages.
+
+        This needs about half of the disk space of installing from the
+        packages, see `vollerei.common.functions.install_scattered()` for
+        more info. You may want to execute `set_version_config()` after this.
+
+        Args:
+            pre_download (bool): Whether to install the pre-download version.
+                Defaults to False.
+            game_info (Main, optional): The game information. Defaults to the
+                latest version.
+            workers (int): How many files to download at once. Defaults to 8.
+            retries (int): How many times to retry a failed download. Defaults to 3.
+            progress (Callable[[DownloadResult, DownloadStats], None], optional):
+                Called after each file is downloaded.
+            adaptive (bool): Whether to adjust the number of concurrent downloads
+                to the server's response. Defaults to True.
+
+        Returns:
+            DownloadStats: The download statistics.
+        """
+        if not game_info:
+            game_info = self.get_remote_game(pre_download=pre_download)
+        try:
+            return functions.install_scattered(
+                self,
+                game_info,
+                workers=workers,
+                retries=retries,
+                progress=progress,
+                adaptive=adaptive,
+            )
+        finally:
+            self._probe.invalidate()
+
+    def switch_channel(
+        self,
+        channel: GameChannel,
+        workers: int = 8,
+        retries: int = 3,
+        progress: Callable[[DownloadResult, DownloadStats], None] = None,
+    ) -> DownloadStats:
+        """
+        Switches the game to another channel, only downloading the files which
+        differ between the channels.
+
+        See `vollerei.common.functions.switch_channel()` for more info.
+
+        Args:
+            channel (GameChannel): The channel to switch to.
+            workers (int): How many files to download at once. Defaults to 8.
+            retries (int): How many times to retry a failed download. Defaults to 3.
+            progress (Callable[[DownloadResult, DownloadStats], None], optional):
+                Called after each file is downloaded.
+
+        Returns:
+            DownloadStats: The download statistics.
+        """
+        game_info = api.get_game_package(game_type=self._game_type, channel=channel)
+        stats = functions.switch_channel(
+            self, game_info.main, workers=workers, retries=retries, progress=progress
+        )
+        self.channel_override = channel
+        return stats
+
+    def find_orphan_files(
+        self, exclude: list[str] | None = None
+    ) -> list[tuple[Path, int]]:
+        """
+        Finds the files in the game folder which aren't in any manifest.
+
+        Args:
+            exclude (list[str], optional): Glob patterns of the files and folders
+                to keep, defaults to `vollerei.constants.ORPHAN_EXCLUDE`.
+
+        Returns:
+            list[tuple[Path, int]]: The orphan files and their sizes, biggest
+                first.
+        """
+        return functions.find_orphan_files(self, exclude=exclude)
+
+    def reclaim_orphan_files(
+        self,
+        files: list[tuple[Path, int]] | None = None,
+        delete: bool = False,
+        workers: int = 8,
+    ) -> functions.ReclaimResult:
+        """
+        Removes orphan files from the game folder.
+
+        The files are moved to a trash folder in the cache unless `delete` is
+        set, so they can be restored if a patcher still needed them.
+
+        Args:
+            files (list[tuple[Path, int]], optional): The files to remove and
+                their sizes, defaults to `find_orphan_files()`.
+            delete (bool): Whether to delete the files instead. Defaults to False.
+            workers (int): How many files to remove at once. Defaults to 8.
+
+        Returns:
+            ReclaimResult: The number of files and bytes reclaimed.
         """
-        functions.repair_game(self)
+        return functions.reclaim_orphan_files(
+            self, files=files, delete=delete, workers=workers
+        )
 
     def install_archive(self, archive_file: PathLike | IOBase) -> None:
         """
@@ -440,7 +828,10 @@ class Game(GameABC):
         """
         if not isinstance(archive_file, IOBase):
             archive_file = Path(archive_file)
-        functions.install_archive(self, archive_file)
+        try:
+            functions.install_archive(self, archive_file)
+        finally:
+            self._probe.invalidate()
 
     def apply_update_archive(
         self, archive_file: PathLike | IOBase, auto_repair: bool = True
@@ -467,7 +858,10 @@ class Game(GameABC):
         if not isinstance(archive_file, IOBase):
             archive_file = Path(archive_file)
         # Hello hell again, dealing with HDiffPatch and all the things again.
-        functions.apply_update_archive(self, archive_file, auto_repair=auto_repair)
+        try:
+            functions.apply_update_archive(self, archive_file, auto_repair=auto_repair)
+        finally:
+            self._probe.invalidate()
 
     def install_update(
         self, update_info: resource.Patch = None, auto_repair: bool = True
@@ -490,6 +884,11 @@ class Game(GameABC):
             update_info = self.get_update()
         if not update_info or update_info.version == self.get_version_str():
             raise GameAlreadyUpdatedError("Game is already updated.")
+        staging_path = self.get_staged_update(update_info)
+        if staging_path:
+            self.apply_staged_update(staging_path, auto_repair=auto_repair)
+            self.set_version_config()
+            return
         update_url = update_info.game_pkgs[0].url
         # Base game update
         archive_file = self.cache.joinpath(PurePath(update_url).name)
@@ -508,3 +907,98 @@ class Game(GameABC):
                 archive_file=archive_file, auto_repair=auto_repair
             )
         self.set_version_config()
+
+    def get_staged_update(self, update_info: resource.Patch) -> Path | None:
+        """
+        Gets the staging folder of an update staged by `stage_update()`.
+
+        Staged updates are matched by the MD5 checksum of the update package, so
+        an update staged from the pre-download is found when the update is
+        released.
+
+        Args:
+            update_info (Patch): The update information.
+
+        Returns:
+            Path | None: The staging folder or `None` if the update isn't staged.
+        """
+        staging_path = self.cache.joinpath("staging", update_info.game_pkgs[0].md5)
+        if not staging_path.joinpath("plan.json").is_file():
+            return None
+        return staging_path
+
+    def stage_update(
+        self, update_info: resource.Patch = None, pre_download: bool = True
+    ) -> Path:
+        """
+        Downloads, verifies and extracts an update ahead of time.
+
+        This is meant to be used with pre-downloads, so when the update is
+        released `install_update()` (or `apply_staged_update()`) only needs to
+        patch and move the files into the game folder.
+
+        Args:
+            update_info (Patch, optional): The update information. Defaults to
+                the pre-download update for the installed version.
+            pre_download (bool): Whether to get the pre-download version if
+                `update_info` is not specified. Defaults to True.
+
+        Returns:
+            Path: The staging folder.
+        """
+        if not self.is_installed():
+            raise GameNotInstalledError("Game is not installed.")
+        if not update_info:
+            update_info = self.get_update(pre_download=pre_download)
+        if not update_info:
+            raise GameAlreadyUpdatedError("Game is already updated.")
+        staging_path = self.get_staged_update(update_info)
+        if staging_path:
+            return staging_path
+        staging_path = self.cache.joinpath("staging", update_info.game_pkgs[0].md5)
+        installed_voicepacks = self.get_installed_voicepacks()
+        packages: list[resource.GamePackage | resource.AudioPackage] = [
+            update_info.game_pkgs[0]
+        ]
+        for remote_voicepack in update_info.audio_pkgs:
+            if remote_voicepack.language in installed_voicepacks:
+                packages.append(remote_voicepack)
+        plan = {"from_version": update_info.version, "packages": []}
+        for package in packages:
+            try:
+                archive_file = functions.download_package(self, package)
+            except ChecksumMismatchError as e:
+                raise StagedUpdateError(str(e)) from e
+            plan["packages"].append(
+                functions.stage_update_archive(
+                    self,
+                    archive_file,
+                    staging_path.joinpath(archive_file.stem),
+                )
+            )
+        # Write the plan last, so an interrupted staging is never used.
+        staging_path.joinpath("plan.json").write_text(json.dumps(plan))
+        return staging_path
+
+    def apply_staged_update(
+        self, staging_path: PathLike, auto_repair: bool = True
+    ) -> None:
+        """
+        Applies an update staged by `stage_update()`.
+
+        You may want to execute `set_version_config()` after this to set the
+        game version.
+
+        Args:
+            staging_path (PathLike): The staging folder.
+            auto_repair (bool, optional): Whether to repair the file if it's broken.
+                Defaults to True.
+        """
+        if not self.is_installed():
+            raise GameNotInstalledError("Game is not installed.")
+        try:
+            functions.apply_staged_update(
+                self, Path(staging_path), auto_repair=auto_repair
+            )
+        finally:
+            self._probe.invalidate()
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Iterable, TypeVar
+
+
+T = TypeVar("T")
+
+
+def _fingerprint(files: Iterable[Path]) -> tuple:
+    fingerprint = []
+    for file in files:
+        try:
+            stat = os.stat(file)
+        except OSError:
+            fingerprint.append((str(file), None, None))
+            continue
+        fingerprint.append((str(file), stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+class InstallProbe:
+    """
+    Memoized state of a game installation (channel, version, voicepacks...).
+
+    Each value is kept with the fingerprints (modification time and size) of
+    the files it was computed from, and is computed again once one of them
+    changes, so checking a value costs a few `stat()` calls instead of reading
+    the game files. Call `invalidate()` after changing the installation
+    (e.g. installing an update) to be safe from files which changed without
+    their fingerprint changing.
+    """
+
+    def __init__(self):
+        self._values: dict[str, tuple[tuple, object]] = {}
+        self._lock = Lock()
+
+    def get(self, name: str, files: Iterable[Path], compute: Callable[[], T]) -> T:
+        """
+        Gets a value, computing it if it isn't known or its files changed.
+
+        Args:
+            name (str): The value name.
+            files (Iterable[Path]): The files the value is computed from,
+                missing files are fine (a file being created changes the
+                fingerprint too). Use the folder for values depending on which
+                files are in a folder.
+            compute (Callable[[], T]): Computes the value.
+
+        Returns:
+            T: The value.
+        """
+        fingerprint = _fingerprint(files)
+        with self._lock:
+            cached = self._values.get(name)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        value = compute()
+        with self._lock:
+            self._values[name] = (fingerprint, value)
+        return value
+
+    def invalidate(self, name: str | None = None) -> None:
+        """
+        Forgets a value (or every value).
+
+        Args:
+            name (str, optional): The value name, defaults to every value.
+        """
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(name, None)
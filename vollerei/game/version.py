@@ -0,0 +1,74 @@
+import mmap
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+
+
+# (path, mtime, size, inode, offset, terminator) -> version
+_cache: dict[tuple, tuple[int, int, int] | None] = {}
+_cache_lock = Lock()
+
+
+@lru_cache
+def _pattern(terminator: bytes) -> re.Pattern:
+    # The version follows a null byte (or the start of the window).
+    return re.compile(rb"(?:^|\x00)(\d+)\.(\d+)\.(\d+)" + re.escape(terminator))
+
+
+def _search(file: Path, offset: int, size: int, terminator: bytes):
+    with file.open("rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                window = mm[offset : offset + size]
+        except ValueError:
+            # Empty files can't be mapped
+            window = b""
+    match = _pattern(terminator).search(window)
+    if match is None:
+        return None
+    return tuple(int(x) for x in match.groups())
+
+
+def sniff_version(
+    file: Path, offset: int, terminator: bytes, size: int = 10000
+) -> tuple[int, int, int] | None:
+    """
+    Finds the game version in a Unity data file.
+
+    Credits to An Anime Team for the method, the version is the first
+    "<major>.<minor>.<patch>" string after a null byte which ends with
+    `terminator`, in the `size` bytes starting at `offset`.
+
+    The file is memory-mapped so only the window is read, and the result is
+    cached until the file changes.
+
+    Args:
+        file (Path): The data file (e.g. "data.unity3d").
+        offset (int): Where the version is searched from.
+        terminator (bytes): The byte after the version.
+        size (int): How many bytes are searched. Defaults to 10000.
+
+    Returns:
+        tuple[int, int, int] | None: The version, or `None` if the file doesn't
+            exist or the version isn't found.
+    """
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return None
+    key = (str(file), stat.st_mtime_ns, stat.st_size, stat.st_ino, offset, terminator)
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+    try:
+        version = _search(Path(file), offset, size, terminator)
+    except OSError:
+        return None
+    with _cache_lock:
+        # Only keep the latest signature of each file.
+        for x in [x for x in _cache if x[0] == key[0]]:
+            del _cache[x]
+        _cache[key] = version
+    return version
@@ -0,0 +1,46 @@
+from os import PathLike
+from pathlib import Path, PurePath
+
+
+# Whether the launcher API and the download servers must not be used, the
+# launcher metadata then comes from the imported snapshot (see `ApiCache`).
+enabled = False
+# Folder with game packages to use instead of downloading them.
+package_path: Path | None = None
+
+
+def set_offline(offline: bool = True, packages: PathLike | None = None) -> None:
+    """
+    Turns offline mode on or off.
+
+    Args:
+        offline (bool): Whether to stay offline. Defaults to True.
+        packages (PathLike, optional): Folder with the game packages, which are
+            used instead of downloading them. This works in online mode too.
+    """
+    global enabled, package_path
+    enabled = offline
+    package_path = Path(packages) if packages else None
+
+
+def find_package(url: str, size: int | None = None) -> Path | None:
+    """
+    Finds a package in the package folder.
+
+    Args:
+        url (str): The package URL, the package is looked up by its file name.
+        size (int, optional): The expected package size.
+
+    Returns:
+        Path | None: The package, or `None` if it isn't in the package folder.
+    """
+    if package_path is None:
+        return None
+    file = package_path.joinpath(PurePath(url).name)
+    try:
+        stat = file.stat()
+    except OSError:
+        return None
+    if size is not None and stat.st_size != size:
+        return None
+    return file
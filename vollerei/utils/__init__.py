@@ -1,9 +1,12 @@
+import os
 import requests
 import platform
 import shutil
 from zipfile import ZipFile
 from io import BytesIO
-from pathlib import Path
+from pathlib import Path, PurePath
+from vollerei import offline
+from vollerei.exceptions.network import OfflineError
 
 match platform.system():
     case "Linux":
@@ -63,10 +66,21 @@ def download(
     """
     Download to a path.
 
+    If the file is in the package folder (see `vollerei.offline`), it's
+    linked (or copied) from there instead.
+
     Args:
         url (str): URL to download from.
         path (Path): Path to download to.
     """
+    package = offline.find_package(url, file_len)
+    if package is not None:
+        _link_package(package, out)
+        return True
+    if offline.enabled:
+        raise OfflineError(
+            f"{PurePath(url).name} isn't in the package folder, can't download it in offline mode."
+        )
     if overwrite:
         out.unlink(missing_ok=True)
     headers = {}
@@ -89,6 +103,19 @@ def download(
     return True
 
 
+def _link_package(package: Path, out: Path) -> None:
+    if out.exists():
+        if out.samefile(package):
+            return
+        out.unlink()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # A hard link costs nothing, but only works on the same file system.
+        os.link(package, out)
+    except OSError:
+        shutil.copyfile(package, out)
+
+
 def download_and_extract(url: str, path: Path) -> None:
     """
     Download and extract a zip file to a path.
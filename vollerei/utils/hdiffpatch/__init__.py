@@ -5,6 +5,8 @@ from zipfile import ZipFile
 import requests
 from io import BytesIO
 from shutil import which
+from threading import RLock
+from vollerei import offline
 from vollerei.constants import HDIFFPATCH_GIT_URL
 from vollerei.paths import tools_data_path
 from vollerei.utils.hdiffpatch.exceptions import (
@@ -13,6 +15,9 @@ from vollerei.utils.hdiffpatch.exceptions import (
     PlatformNotSupportedError,
 )
 
+# Only one thread downloads the binaries, the others wait for it.
+_download_lock = RLock()
+
 
 class HDiffPatch:
     """
@@ -67,22 +72,24 @@ class HDiffPatch:
             return exec_name
         if platform.system() == "Windows" and not exec_name.endswith(".exe"):
             exec_name += ".exe"
-        if self._hdiff.exists() and any(self._hdiff.iterdir()):
-            file = self._hdiff.joinpath(self._get_platform_arch(), exec_name)
-            if file.exists():
-                if platform.system() != "Windows":
-                    file.chmod(0o755)
-                return str(file)
-        if recurse is None:
-            recurse = 3
-        elif recurse == 0:
-            raise NotInstalledError(
-                "HDiffPatch is not installed and can't be automatically installed"
-            )
-        else:
-            recurse -= 1
-        self.download()
-        return self._get_binary(exec_name=exec_name, recurse=recurse)
+        # Another thread may be downloading the binaries, wait for it.
+        with _download_lock:
+            if self._hdiff.exists() and any(self._hdiff.iterdir()):
+                file = self._hdiff.joinpath(self._get_platform_arch(), exec_name)
+                if file.exists():
+                    if platform.system() != "Windows":
+                        file.chmod(0o755)
+                    return str(file)
+            if recurse is None:
+                recurse = 3
+            elif recurse == 0:
+                raise NotInstalledError(
+                    "HDiffPatch is not installed and can't be automatically installed"
+                )
+            else:
+                recurse -= 1
+            self.download()
+            return self._get_binary(exec_name=exec_name, recurse=recurse)
 
     def hpatchz(self) -> str | None:
         return self._get_binary("hpatchz")
@@ -124,6 +131,10 @@ class HDiffPatch:
         """
         Download the latest release of HDiffPatch.
         """
+        if offline.enabled:
+            raise NotInstalledError(
+                "HDiffPatch is not installed and can't be downloaded in offline mode"
+            )
         url = self.get_latest_release_url()
         if not url:
             raise RuntimeError("Unable to find latest release")
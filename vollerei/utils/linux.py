@@ -1,8 +1,15 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import struct
 import subprocess
+import threading
 from pathlib import Path
 
 
-__all__ = ["exec_su", "write_text", "append_text"]
+__all__ = ["exec_su", "write_text", "append_text", "set_idle_priority", "Inotify"]
 
 
 def exec_su(args, stdin: str = None):
@@ -37,3 +44,100 @@ def append_text(text, path: str | Path):
     if isinstance(path, Path):
         path = str(path)
     exec_su(f'tee -a "{path}"', stdin=text)
+
+
+def set_idle_priority():
+    """
+    Set the calling thread (and threads started by it afterwards) to idle CPU
+    and I/O priority, so it only runs when nothing else needs the CPU or disk.
+    """
+    os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+    if shutil.which("ionice"):
+        subprocess.run(
+            ["ionice", "-c", "3", "-p", str(threading.get_native_id())],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+
+class Inotify:
+    """Watch folders for changes with inotify"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    # struct inotify_event: wd, mask, cookie, len (then the name)
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watches: dict[int, Path] = {}
+
+    def add_watch(self, path: Path, mask: int) -> int:
+        """Watch a folder (not recursively)"""
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), ctypes.c_uint32(mask)
+        )
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        self._watches[wd] = Path(path)
+        return wd
+
+    def add_tree(self, path: Path, mask: int, exclude: list[str] = None):
+        """Watch a folder and all its subfolders"""
+        for root, dirs, _ in os.walk(path):
+            if exclude:
+                dirs[:] = [x for x in dirs if x not in exclude]
+            self.add_watch(Path(root), mask)
+
+    def read(self, timeout: float = None) -> list[tuple[Path | None, int]]:
+        """
+        Wait for events and return them as (path, mask) tuples.
+
+        The path is `None` if the event queue overflowed (`IN_Q_OVERFLOW`),
+        an empty list is returned if no event happened before the timeout.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_IGNORED:
+                # The folder was deleted (or unwatched)
+                self._watches.pop(wd, None)
+                continue
+            folder = self._watches.get(wd)
+            if folder is None:
+                events.append((None, mask))
+                continue
+            events.append(
+                (folder.joinpath(os.fsdecode(name)) if name else folder, mask)
+            )
+        return events
+
+    def close(self):
+        """Stop watching and release the inotify instance"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()